@@ -0,0 +1,57 @@
+"""Build time and query latency of `ChoiceIndex` over 100k choices.
+
+The choices are made up names, ranked by a random weight. The query cache
+is disabled, the numbers are for computed suggestions.
+
+    python -m benchmarks.autocomplete
+"""
+
+import random
+import time
+import timeit
+
+from disinter.autocomplete import ChoiceIndex
+
+CHOICES = 100_000
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ra", "to", "su", "vi", "an", "el", "or"]
+SUFFIXES = ["", " City", " Town", " Falls", " Bay", " Hills"]
+
+
+def make_names(count: int) -> list:
+    names: set = set()
+    while len(names) < count:
+        name = "".join(random.choices(SYLLABLES, k=random.randint(2, 6)))
+        names.add(name.capitalize() + random.choice(SUFFIXES))
+
+    return sorted(names)
+
+
+def main() -> None:
+    random.seed(0)
+    names = make_names(CHOICES)
+    weights = [random.random() for _ in names]
+
+    start = time.perf_counter()
+    index = ChoiceIndex(names, weights=weights, cache_size=0)
+    print(f"build {len(index)} choices: {time.perf_counter() - start:.2f} s")
+
+    queries = {
+        "empty": "",
+        "1 char": "k",
+        "prefix": "kalo",
+        "long prefix": "kalomine",
+        "substring": "omira",
+        "typo": "kalomne",
+    }
+    for label, query in queries.items():
+        number = 200
+        seconds = timeit.timeit(lambda: index.search(query), number=number)
+        print(
+            f"  {label:<12}{query!r:<12}{seconds / number * 1e6:>9.1f} us"
+            f"  {len(index.search(query))} results"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Memory footprint of the response, component and command objects.
+
+Prints the bytes used by a single instance of each class (including its
+`__dict__` if it has one) and the memory and number of live allocations
+of a full response: an embed with 25 fields and 5 rows of 5 buttons.
+
+    python -m benchmarks.memory
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from disinter.command import ApplicationCommand, ApplicationCommandOption
+from disinter.components import (
+    ComponentActionRows,
+    ComponentButton,
+    ComponentSelectMenu,
+    ComponentSelectMenuOption,
+    Embed,
+    EmbedField,
+    EmbedFooter,
+)
+from disinter.response import DiscordResponse, ResponseData
+
+RESPONSES = 100
+
+
+def object_size(obj: object) -> int:
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+
+    return size
+
+
+def build_response() -> DiscordResponse:
+    embed = Embed(
+        title="Leaderboard",
+        description="Top 25",
+        color=0x5865F2,
+        footer=EmbedFooter("page 1/10"),
+        fields=[EmbedField(f"#{i}", f"{1000 - i} points", True) for i in range(25)],
+    )
+    rows = [
+        ComponentActionRows(
+            [
+                ComponentButton(1, label=f"{r}:{c}", custom_id=f"page:{r}:{c}")
+                for c in range(5)
+            ]
+        )
+        for r in range(5)
+    ]
+
+    return DiscordResponse(
+        4, ResponseData(content="hi", embeds=[embed], components=rows)
+    )
+
+
+def main() -> None:
+    objects = [
+        EmbedField("name", "value", True),
+        Embed(title="title"),
+        ComponentButton(1, label="label", custom_id="custom_id"),
+        ComponentSelectMenuOption("label", "value"),
+        ComponentSelectMenu(3, "custom_id"),
+        ComponentActionRows([]),
+        ApplicationCommandOption(3, "name", "description"),
+        ApplicationCommand("name", "description"),
+        ResponseData(content="content"),
+        DiscordResponse(4),
+    ]
+
+    print("bytes per object")
+    for obj in objects:
+        print(f"  {type(obj).__name__:<28}{object_size(obj):>6} B")
+
+    # warm up, so that interned strings and caches are not counted
+    build_response()._to_json()
+    gc.collect()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    responses = [build_response() for _ in range(RESPONSES)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    size = sum(i.size_diff for i in stats) / len(responses)
+    blocks = sum(i.count_diff for i in stats) / len(responses)
+
+    print("per response")
+    print(f"  {'memory':<28}{size:>6.0f} B")
+    print(f"  {'allocations':<28}{blocks:>6.0f}")
+
+
+if __name__ == "__main__":
+    main()
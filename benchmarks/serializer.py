@@ -0,0 +1,97 @@
+"""Speed of the generated `_to_json` serializers.
+
+A response with a 25-field embed (footer and author) and 5 action rows of
+5 buttons with emojis is serialized with its generated serializers and
+with a generic walk of its attributes, like the serializers they replaced.
+
+    python -m benchmarks.serializer
+"""
+
+import timeit
+
+from disinter.components import (
+    ButtonStyles,
+    ComponentActionRows,
+    ComponentButton,
+    Embed,
+    EmbedAuthor,
+    EmbedField,
+    EmbedFooter,
+    Emoji,
+)
+from disinter.response import DiscordResponse, ResponseData
+from disinter.serializer import slot_fields
+
+
+def build() -> DiscordResponse:
+    embed = Embed(
+        title="Leaderboard",
+        description="d" * 100,
+        color=0xFF00FF,
+        footer=EmbedFooter("page 1/10", icon_url="https://example.com/icon.png"),
+        author=EmbedAuthor("bot"),
+        fields=[EmbedField(f"#{i}", "v" * 30, True) for i in range(25)],
+    )
+    rows = [
+        ComponentActionRows(
+            [
+                ComponentButton(
+                    ButtonStyles.Primary,
+                    label=f"b{r}{c}",
+                    custom_id=f"id{r}{c}",
+                    emoji=Emoji(name="x"),
+                )
+                for c in range(5)
+            ]
+        )
+        for r in range(5)
+    ]
+    return DiscordResponse(
+        4, ResponseData(content="hi", embeds=[embed], components=rows)
+    )
+
+
+FIELDS: dict = {}
+
+
+def walk(obj):
+    # branches on every attribute name, like the `vars()` based serializers
+    cls = type(obj)
+    fields = FIELDS.get(cls)
+    if fields is None:
+        fields = FIELDS[cls] = slot_fields(cls)
+
+    json = {}
+    for key in fields:
+        value = getattr(obj, key)
+        if value is not None:
+            if key in cls._json_nested:
+                json[key] = walk(value)
+                continue
+
+            if key in cls._json_lists:
+                json[key] = [walk(i) for i in value]
+                continue
+
+            json[key] = value
+
+    return json
+
+
+def main() -> None:
+    response = build()
+    assert walk(response) == response._to_json()
+
+    number = 5000
+    for label, func in {
+        "walk": lambda: walk(response),
+        "generated": response._to_json,
+        "build+walk": lambda: walk(build()),
+        "build+generated": lambda: build()._to_json(),
+    }.items():
+        elapsed = timeit.timeit(func, number=number)
+        print(f"{label:<16}{elapsed / number * 1e6:>8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Speed and density of `StateCodec` custom_ids.
+
+The state of a paginator (user, message, page, sort order, direction) is
+packed with the codec, signed and unsigned, and compared with the same
+state joined as text and as base64 encoded JSON.
+
+    python -m benchmarks.state
+"""
+
+import base64
+import json
+import timeit
+
+from disinter.state import (
+    BoolField,
+    EnumField,
+    IntField,
+    SnowflakeField,
+    StateCodec,
+)
+
+FIELDS = {
+    "user": SnowflakeField(),
+    "message": SnowflakeField(),
+    "page": IntField(9999),
+    "sort": EnumField(["new", "top", "old", "random"]),
+    "asc": BoolField(),
+}
+
+STATE = {
+    "user": "238094413429604352",
+    "message": "1091486478163071036",
+    "page": 1234,
+    "sort": "top",
+    "asc": True,
+}
+
+
+def text_encode(state: dict) -> str:
+    return "pg:" + ":".join(str(i) for i in state.values())
+
+
+def json_encode(state: dict) -> str:
+    return "pg:" + base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+def main() -> None:
+    codecs = {
+        "codec": StateCodec("pg", FIELDS),
+        "codec+hmac": StateCodec("pg", FIELDS, secret=b"secret"),
+    }
+
+    number = 100_000
+    for label, codec in codecs.items():
+        custom_id = codec.encode(**STATE)
+        assert codec.decode(custom_id) == STATE
+
+        encode = timeit.timeit(lambda: codec.encode(**STATE), number=number)
+        decode = timeit.timeit(lambda: codec.decode(custom_id), number=number)
+        print(
+            f"{label:<12}{len(custom_id):>4} chars"
+            f"  encode {encode / number * 1e6:.2f} us"
+            f"  decode {decode / number * 1e6:.2f} us"
+        )
+
+    for label, encoder in {"text": text_encode, "json+base64": json_encode}.items():
+        print(f"{label:<12}{len(encoder(STATE)):>4} chars")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import time
 from typing import Any, Dict, List
 
-from requests import Session
+from requests import Response, Session
 
 from disinter import DISCORD_API
+from disinter.cache import EntityCache
 from disinter.errors import APIError
+from disinter.ratelimit import RETRY_STATUSES, RateLimiter
+from disinter.singleflight import SingleFlight
 from disinter.types import APIApplicationCommand, User
 from disinter.types.custom import SnowFlake
 from disinter.types.guild import Guild
@@ -13,9 +17,28 @@ from disinter.types.interaction import Channel
 
 
 class DiscordAPI:
-    def __init__(self, token: str, application_id: int | str) -> None:
+    def __init__(
+        self,
+        token: str,
+        application_id: int | str,
+        rate_limiter: RateLimiter | None = None,
+        cache: EntityCache | None = None,
+        coalesce: bool = True,
+    ) -> None:
+        """Client of the Discord API.
+
+        Args:
+            token (str): Bot token.
+            application_id (int | str): Application ID of the bot.
+            rate_limiter (RateLimiter | None, optional): Rate limits of the bot token, share it between the clients of a token. Defaults to None, a new `RateLimiter`.
+            cache (EntityCache | None, optional): Read-through cache of `get_user`, `get_channel` and `get_guild`. Defaults to None, no cache.
+            coalesce (bool, optional): Share one request between identical GETs in flight at the same time. Defaults to True.
+        """
         self.token = token
         self.application_id = application_id
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.cache = cache
+        self.single_flight = SingleFlight() if coalesce else None
 
         self._session = Session()
         self._session.headers.update({"Authorization": f"Bot {token}"})
@@ -39,20 +62,70 @@ class DiscordAPI:
             APIError: APIError with error response in dictionary
 
         Returns:
-            Dict[str, Any]: JSON response returned by the api.
+            Dict[str, Any]: JSON response returned by the api, None if it has no content.
         """
+        if method == "GET" and self.single_flight is not None:
+            key = (endpoint, tuple(sorted(params.items())) if params else None)
+            return self.single_flight.do(
+                key, lambda: self._send(endpoint, method, params, body)
+            )
 
-        r = self._session.request(
-            method=method, url=DISCORD_API + endpoint, params=params, json=body
-        )
+        return self._send(endpoint, method, params, body)
 
-        data = r.json()
+    def _send(
+        self,
+        endpoint: str,
+        method: str,
+        params: Dict[str, Any] = None,
+        body: Any = None,
+    ):
+        limiter = self.rate_limiter
+        route = limiter.route(method, endpoint)
+
+        for attempt in range(limiter.max_retries + 1):
+            limiter.wait(route)
+            r = self._session.request(
+                method=method, url=DISCORD_API + endpoint, params=params, json=body
+            )
+            limiter.update(route, r.headers)
+
+            data = _json(r)
+            if r.status_code == 429:
+                delay = limiter.on_rate_limited(route, r.headers, data)
+            elif r.status_code in RETRY_STATUSES:
+                delay = limiter.backoff(attempt)
+            else:
+                break
+
+            if attempt < limiter.max_retries:
+                limiter.retries += 1
+                time.sleep(delay)
 
         if not r.ok:
-            raise APIError(data)
+            raise APIError(data, r.status_code)
 
         return data
 
+    def _get_entity(self, resource: str, id: SnowFlake, endpoint: str):
+        """GET an entity through the cache, if there is one. 404s are cached as missing."""
+
+        if self.cache is None:
+            return self._request(endpoint, "GET")
+
+        value = self.cache.get(resource, id)
+        if value is not None:
+            return value
+
+        try:
+            value = self._request(endpoint, "GET")
+        except APIError as e:
+            if e.status == 404:
+                self.cache.set_missing(resource, id, e.error)
+            raise
+
+        self.cache.set(resource, id, value)
+        return value
+
     def me(self) -> User:
         """Get's the requester's user object.
 
@@ -73,13 +146,14 @@ class DiscordAPI:
         if user_id == 0 or user_id == "":
             raise ValueError("`user_id` cannot be empty")
 
-        return self._request(f"/users/{user_id}", "GET")
+        return self._get_entity("user", user_id, f"/users/{user_id}")
 
-    def get_channel(self, channel_id: SnowFlake) -> Channel:
+    def get_channel(self, channel_id: SnowFlake, partial: bool = False) -> Channel:
         """Get's a channel by id. If the channel is a thread, a thread member object is included in the returned result.
 
         Args:
             channel_id (SnowFlake): The channel id.
+            partial (bool, optional): Accept the partial channel of an interaction (id, name, type, permissions) if it is cached. Defaults to False.
 
         Returns:
             Channel
@@ -87,7 +161,12 @@ class DiscordAPI:
         if channel_id == 0 or channel_id == "":
             raise ValueError("`channel_id` cannot be empty")
 
-        return self._request(f"/channels/{channel_id}", "GET")
+        if partial and self.cache is not None:
+            channel = self.cache.get("partial_channel", channel_id)
+            if channel is not None:
+                return channel
+
+        return self._get_entity("channel", channel_id, f"/channels/{channel_id}")
 
     def get_guild(self, guild_id: SnowFlake, with_counts: bool = False) -> Guild:
         """Get's a guild by id. If `with_counts` is set to true, this endpoint
@@ -103,6 +182,10 @@ class DiscordAPI:
         if guild_id == 0 or guild_id == "":
             raise ValueError("`guild_id` cannot be empty")
 
+        if not with_counts:
+            # the counts are asked for fresh, only plain guilds are cached
+            return self._get_entity("guild", guild_id, f"/guilds/{guild_id}")
+
         return self._request(
             f"/guilds/{guild_id}", "GET", params={"with_counts": with_counts}
         )
@@ -218,7 +301,7 @@ class DiscordAPI:
         if guild is not None:
             return self._request(
                 f"/applications/{self.application_id}/guilds/{guild}/commands/{command_id}",
-                "GET",
+                "DELETE",
             )
 
         return self._request(
@@ -247,3 +330,32 @@ class DiscordAPI:
         return self._request(
             f"/applications/{self.application_id}/commands", "PUT", body=commands
         )
+
+    def edit_original_interaction_response(
+        self, interaction_token: str, message: Dict[str, Any]
+    ):
+        """Edit the initial response to an interaction.
+
+        Args:
+            interaction_token (str): Token of the interaction.
+            message (Dict[str, Any]): Message fields to edit.
+
+        Returns:
+            Message
+        """
+        return self._request(
+            f"/webhooks/{self.application_id}/{interaction_token}/messages/@original",
+            "PATCH",
+            body=message,
+        )
+
+
+def _json(r: Response) -> Any:
+    # 204 No Content, or the html page of a gateway error
+    if not r.content:
+        return None
+
+    try:
+        return r.json()
+    except ValueError:
+        return {"code": r.status_code, "message": r.text}
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List
+
+import httpx
+
+from disinter import DISCORD_API
+from disinter.cache import EntityCache
+from disinter.errors import APIError
+from disinter.ratelimit import RETRY_STATUSES, RateLimiter
+from disinter.singleflight import AsyncSingleFlight
+from disinter.types import APIApplicationCommand, User
+from disinter.types.custom import SnowFlake
+from disinter.types.guild import Guild
+from disinter.types.interaction import Channel
+
+
+class AsyncDiscordAPI:
+    def __init__(
+        self,
+        token: str,
+        application_id: int | str,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        timeout: float = 10.0,
+        rate_limiter: RateLimiter | None = None,
+        cache: EntityCache | None = None,
+        coalesce: bool = True,
+    ) -> None:
+        """Async client of the Discord API, with the methods of `DiscordAPI`.
+        Requests share a pool of keep-alive connections, so that handlers
+        do not block the event loop nor open a connection per request.
+
+        Args:
+            token (str): Bot token.
+            application_id (int | str): Application ID of the bot.
+            max_connections (int, optional): Maximum number of open connections. Defaults to 100.
+            max_keepalive_connections (int, optional): Idle connections kept open. Defaults to 20.
+            keepalive_expiry (float, optional): Seconds an idle connection is kept open. Defaults to 30.0.
+            http2 (bool, optional): Multiplex the requests over HTTP/2 connections. Requires `httpx[http2]`. Defaults to False.
+            timeout (float, optional): Seconds before a request times out. Defaults to 10.0.
+            rate_limiter (RateLimiter | None, optional): Rate limits of the bot token, share it between the clients of a token. Defaults to None, a new `RateLimiter`.
+            cache (EntityCache | None, optional): Read-through cache of `get_user`, `get_channel` and `get_guild`. Defaults to None, no cache.
+            coalesce (bool, optional): Share one request between identical GETs in flight at the same time. Defaults to True.
+        """
+        self.token = token
+        self.application_id = application_id
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.cache = cache
+        self.single_flight = AsyncSingleFlight() if coalesce else None
+
+        self._client = httpx.AsyncClient(
+            base_url=DISCORD_API,
+            headers={"Authorization": f"Bot {token}"},
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+            timeout=timeout,
+        )
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+
+        await self._client.aclose()
+
+    async def _request(
+        self,
+        endpoint: str,
+        method: str,
+        params: Dict[str, Any] = None,
+        body: Any = None,
+    ):
+        """Default internal base request function for all of methods in the class.
+
+        Args:
+            endpoint (str): endpoint tot send request to
+            method (str): method of request
+            params (Dict[str, Any], optional): url params if available. Defaults to None.
+            body (Dict[str, Any], optional): json body if available. Defaults to None.
+
+        Raises:
+            APIError: APIError with error response in dictionary
+
+        Returns:
+            Dict[str, Any]: JSON response returned by the api, None if it has no content.
+        """
+        if method == "GET" and self.single_flight is not None:
+            key = (endpoint, tuple(sorted(params.items())) if params else None)
+            return await self.single_flight.do(
+                key, lambda: self._send(endpoint, method, params, body)
+            )
+
+        return await self._send(endpoint, method, params, body)
+
+    async def _send(
+        self,
+        endpoint: str,
+        method: str,
+        params: Dict[str, Any] = None,
+        body: Any = None,
+    ):
+        limiter = self.rate_limiter
+        route = limiter.route(method, endpoint)
+
+        for attempt in range(limiter.max_retries + 1):
+            await limiter.wait_async(route)
+            r = await self._client.request(method, endpoint, params=params, json=body)
+            limiter.update(route, r.headers)
+
+            data = _json(r)
+            if r.status_code == 429:
+                delay = limiter.on_rate_limited(route, r.headers, data)
+            elif r.status_code in RETRY_STATUSES:
+                delay = limiter.backoff(attempt)
+            else:
+                break
+
+            if attempt < limiter.max_retries:
+                limiter.retries += 1
+                await asyncio.sleep(delay)
+
+        if not r.is_success:
+            raise APIError(data, r.status_code)
+
+        return data
+
+    async def _get_entity(self, resource: str, id: SnowFlake, endpoint: str):
+        """GET an entity through the cache, if there is one. 404s are cached as missing."""
+
+        if self.cache is None:
+            return await self._request(endpoint, "GET")
+
+        value = self.cache.get(resource, id)
+        if value is not None:
+            return value
+
+        try:
+            value = await self._request(endpoint, "GET")
+        except APIError as e:
+            if e.status == 404:
+                self.cache.set_missing(resource, id, e.error)
+            raise
+
+        self.cache.set(resource, id, value)
+        return value
+
+    async def me(self) -> User:
+        """Get's the requester's user object.
+
+        Returns:
+            User
+        """
+        return await self._request("/users/@me", "GET")
+
+    async def get_user(self, user_id: SnowFlake) -> User:
+        """Get's a user by id.
+
+        Args:
+            user_id (int | str): The user's ID.
+
+        Returns:
+            User
+        """
+        if user_id == 0 or user_id == "":
+            raise ValueError("`user_id` cannot be empty")
+
+        return await self._get_entity("user", user_id, f"/users/{user_id}")
+
+    async def get_channel(
+        self, channel_id: SnowFlake, partial: bool = False
+    ) -> Channel:
+        """Get's a channel by id. If the channel is a thread, a thread member object is included in the returned result.
+
+        Args:
+            channel_id (SnowFlake): The channel id.
+            partial (bool, optional): Accept the partial channel of an interaction (id, name, type, permissions) if it is cached. Defaults to False.
+
+        Returns:
+            Channel
+        """
+        if channel_id == 0 or channel_id == "":
+            raise ValueError("`channel_id` cannot be empty")
+
+        if partial and self.cache is not None:
+            channel = self.cache.get("partial_channel", channel_id)
+            if channel is not None:
+                return channel
+
+        return await self._get_entity("channel", channel_id, f"/channels/{channel_id}")
+
+    async def get_guild(self, guild_id: SnowFlake, with_counts: bool = False) -> Guild:
+        """Get's a guild by id. If `with_counts` is set to true, this endpoint
+        will also return `approximate_member_count` and `approximate_presence_count` for the guild.
+
+        Args:
+            guild_id (SnowFlake): The guild id.
+            with_counts (bool, optional): When true, will return approximate member and presence counts for the guild. Defaults to False.
+
+        Returns:
+            Guild
+        """
+        if guild_id == 0 or guild_id == "":
+            raise ValueError("`guild_id` cannot be empty")
+
+        if not with_counts:
+            # the counts are asked for fresh, only plain guilds are cached
+            return await self._get_entity("guild", guild_id, f"/guilds/{guild_id}")
+
+        return await self._request(
+            f"/guilds/{guild_id}", "GET", params={"with_counts": with_counts}
+        )
+
+    async def get_application_commands(
+        self, guild: int | str | None = None, **kwargs
+    ) -> List[APIApplicationCommand]:
+        """Get application commands.
+
+        Args:
+            guild (int | str | None, optional): Guild to get the application commands. If None, gets the global commands. Defaults to None.
+
+        Returns:
+            List[APIApplicationCommand]
+        """
+        if guild is not None:
+            return await self._request(
+                f"/applications/{self.application_id}/guilds/{guild}/commands",
+                "GET",
+                params=kwargs,
+            )
+
+        return await self._request(
+            f"/applications/{self.application_id}/commands", "GET", params=kwargs
+        )
+
+    async def create_application_command(
+        self, command: Dict[str, Any], guild: int | str | None = None
+    ) -> APIApplicationCommand:
+        """Create an application command.
+
+        Args:
+            command (Dict[str, Any]): Application command object.
+            guild (int | str | None, optional): Guild to create the command. If None, creates a global command. Defaults to None.
+
+        Returns:
+            APIApplicationCommand
+        """
+        if guild is not None:
+            return await self._request(
+                f"/applications/{self.application_id}/guilds/{guild}/commands",
+                "POST",
+                body=command,
+            )
+
+        return await self._request(
+            f"/applications/{self.application_id}/commands", "POST", body=command
+        )
+
+    async def get_application_command(
+        self, command_id: int | str, guild: int | str | None = None
+    ) -> APIApplicationCommand:
+        """Get an application command.
+
+        Args:
+            command_id (int | str): ID of the command to fetch.
+            guild (int | str | None, optional): Guild to fetch the command_id. If None, fetches from the global commands. Defaults to None.
+
+        Returns:
+            APIApplicationCommand
+        """
+        if guild is not None:
+            return await self._request(
+                f"/applications/{self.application_id}/guilds/{guild}/commands/{command_id}",
+                "GET",
+            )
+
+        return await self._request(
+            f"/applications/{self.application_id}/commands/{command_id}", "GET"
+        )
+
+    async def edit_application_command(
+        self,
+        command_id: int | str,
+        command: Dict[str, Any],
+        guild: int | str | None = None,
+    ) -> APIApplicationCommand:
+        """Edit an application command.
+
+        Args:
+            command_id (int | str): ID of the command to edit.
+            command (Dict[str, Any]): Application command object.
+            guild (int | str | None, optional): Guild to update the command. If None, updates the command in the global commands. Defaults to None.
+
+        Returns:
+            APIApplicationCommand
+        """
+        if guild is not None:
+            return await self._request(
+                f"/applications/{self.application_id}/guilds/{guild}/commands/{command_id}",
+                "PATCH",
+                body=command,
+            )
+
+        return await self._request(
+            f"/applications/{self.application_id}/commands/{command_id}",
+            "PATCH",
+            body=command,
+        )
+
+    async def delete_application_command(
+        self, command_id: int | str, guild: int | str | None = None
+    ) -> None:
+        """Delete an application command.
+
+        Args:
+            command_id (int | str): ID of the command to delete.
+            guild (int | str | None, optional): Guild to remove the command. If None, removes the command in the global commands. Defaults to None.
+        """
+        if guild is not None:
+            return await self._request(
+                f"/applications/{self.application_id}/guilds/{guild}/commands/{command_id}",
+                "DELETE",
+            )
+
+        return await self._request(
+            f"/applications/{self.application_id}/commands/{command_id}", "DELETE"
+        )
+
+    async def bulk_overwrite_application_commands(
+        self, commands: List[Dict[str, Any]], guild: int | str | None = None
+    ) -> List[APIApplicationCommand]:
+        """Bulk overwrite commands.
+
+        Args:
+            commands (List[Dict[str, Any]]): List of commands to create and overwrite.
+            guild (int | str | None, optional): Guild to overwrite the commands. If None, it will overwrite to the global commands. Defaults to None.
+
+        Returns:
+            List[APIApplicationCommand]
+        """
+        if guild is not None:
+            return await self._request(
+                f"/applications/{self.application_id}/guilds/{guild}/commands",
+                "PUT",
+                body=commands,
+            )
+
+        return await self._request(
+            f"/applications/{self.application_id}/commands", "PUT", body=commands
+        )
+
+    async def edit_original_interaction_response(
+        self, interaction_token: str, message: Dict[str, Any]
+    ):
+        """Edit the initial response to an interaction.
+
+        Args:
+            interaction_token (str): Token of the interaction.
+            message (Dict[str, Any]): Message fields to edit.
+
+        Returns:
+            Message
+        """
+        return await self._request(
+            f"/webhooks/{self.application_id}/{interaction_token}/messages/@original",
+            "PATCH",
+            body=message,
+        )
+
+
+def _json(r: httpx.Response) -> Any:
+    # 204 No Content, or the html page of a gateway error
+    if not r.content:
+        return None
+
+    try:
+        return r.json()
+    except ValueError:
+        return {"code": r.status_code, "message": r.text}
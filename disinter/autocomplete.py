@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import heapq
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain, compress
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+from disinter.cache import TTLCache
+from disinter.command import ApplicationCommandOptionChoice
+
+# most suggestions Discord accepts in an autocomplete response
+MAX_SUGGESTIONS = 25
+
+# sorts after every character, ends the range of keys sharing a prefix
+_PREFIX_END = "\U0010ffff"
+
+# prefix ranges up to this size are ranked directly instead of filtering their bucket
+_RANK_RANGE = 10 * MAX_SUGGESTIONS
+
+# postings of the fuzzy index are read this many at a time
+_POSTINGS_BLOCK = 64
+
+Choice = Union[str, Tuple[str, Union[str, int, float]], ApplicationCommandOptionChoice]
+
+
+class ChoiceIndex:
+    def __init__(
+        self,
+        choices: Iterable[Choice],
+        weights: Sequence[float] | None = None,
+        fuzzy: bool = True,
+        ngram: int = 3,
+        precompute: int = 3,
+        cache_size: int = 4096,
+        max_postings: int = 256,
+    ) -> None:
+        """Index of autocomplete choices, searched by prefix first and
+        then by shared n-grams to also match substrings and typos.
+
+        Matches are ranked by weight (the input order if there are no weights)
+        and returned as the choices themselves, ready for `ctx.suggest`.
+
+        Args:
+            choices (Iterable[Choice]): Names (also the value), `(name, value)` tuples or `ApplicationCommandOptionChoice`s.
+            weights (Sequence[float] | None, optional): Rank of each choice, higher first. Defaults to None.
+            fuzzy (bool, optional): Fill up the suggestions with n-gram matches. Defaults to True.
+            ngram (int, optional): Length of the n-grams of the fuzzy index. Defaults to 3.
+            precompute (int, optional): Rank the matches of every prefix up to this length upfront. Defaults to 3.
+            cache_size (int, optional): Number of recent queries whose suggestions are remembered, `0` disables it. Defaults to 4096.
+            max_postings (int, optional): Candidates kept per n-gram of the fuzzy index, the ones with the highest weight. Defaults to 256.
+        """
+        self.choices: List[ApplicationCommandOptionChoice] = [
+            _to_choice(i) for i in choices
+        ]
+        if weights is None:
+            weights = [-i for i in range(len(self.choices))]
+        elif len(weights) != len(self.choices):
+            raise ValueError("`weights` must have one weight per choice")
+
+        self.weights = weights
+        self.ngram = ngram
+        self.precompute = precompute
+
+        # choice ids sorted by their normalized name, so that a prefix is a range
+        names = [i.name.casefold() for i in self.choices]
+        self._names = names
+        self._sorted = sorted(range(len(names)), key=names.__getitem__)
+        self._keys = [names[i] for i in self._sorted]
+
+        # best matches of the short prefixes, and all matches of the longest
+        # ones by weight, to be filtered for longer queries
+        self._top: Dict[str, Tuple[int, ...]] = {}
+        self._buckets: Dict[str, array] = {}
+        for length in range(precompute + 1):
+            self._rank_prefixes(length, length == precompute)
+
+        # every keystroke is a query, the same ones are typed over and over
+        self._results: TTLCache[Tuple[str, int], Tuple[int, ...]] | None = None
+        if cache_size > 0:
+            self._results = TTLCache(cache_size)
+        # sync autocomplete handlers search from the handler threads
+        self._lock = threading.Lock()
+
+        self._grams: Dict[str, Tuple[int, ...]] | None = None
+        if fuzzy:
+            # postings are filled by descending weight, the best candidates come first
+            grams: Dict[str, List[int]] = {}
+            for i in sorted(range(len(names)), key=weights.__getitem__, reverse=True):
+                for gram in set(_ngrams(names[i], ngram)):
+                    posting = grams.setdefault(gram, [])
+                    if len(posting) < max_postings:
+                        posting.append(i)
+
+            self._grams = {k: tuple(v) for k, v in grams.items()}
+
+    def __len__(self) -> int:
+        return len(self.choices)
+
+    def _rank(self, lo: int, hi: int) -> Tuple[int, ...]:
+        ids = self._sorted[lo:hi]
+        key = self.weights.__getitem__
+        if len(ids) > 40 * MAX_SUGGESTIONS:
+            return tuple(heapq.nlargest(MAX_SUGGESTIONS, ids, key=key))
+
+        # a sort in C is faster than a heap up to about a thousand ids
+        ids.sort(key=key, reverse=True)
+        return tuple(ids[:MAX_SUGGESTIONS])
+
+    def _rank_prefixes(self, length: int, bucket: bool = False) -> None:
+        # keys sharing a prefix are contiguous, rank every group of them at once
+        keys = self._keys
+        lo = 0
+        while lo < len(keys):
+            prefix = keys[lo][:length]
+            hi = bisect_left(keys, prefix + _PREFIX_END, lo)
+
+            if bucket:
+                ids = sorted(
+                    self._sorted[lo:hi], key=self.weights.__getitem__, reverse=True
+                )
+                self._buckets[prefix] = array("I", ids)
+                self._top[prefix] = tuple(ids[:MAX_SUGGESTIONS])
+            else:
+                self._top[prefix] = self._rank(lo, hi)
+
+            lo = hi
+
+    def prefix(self, query: str) -> Tuple[int, ...]:
+        """Ids of the best choices starting with the query, ignoring case."""
+
+        query = query.casefold()
+
+        ranked = self._top.get(query)
+        if ranked is not None:
+            return ranked
+
+        lo = bisect_left(self._keys, query)
+        hi = bisect_left(self._keys, query + _PREFIX_END, lo)
+
+        # filtering the bucket reads about 25 * len(bucket) / (hi - lo) ids,
+        # ranking the range reads all of them
+        bucket = self._buckets.get(query[: self.precompute])
+        if (
+            bucket is None
+            or hi - lo <= _RANK_RANGE
+            or (hi - lo) ** 2 < MAX_SUGGESTIONS * len(bucket)
+        ):
+            return self._rank(lo, hi)
+
+        # many matches, the best ones come early in the bucket of their prefix
+        names = self._names
+        found: List[int] = []
+        for i in bucket:
+            if names[i].startswith(query):
+                found.append(i)
+                if len(found) == MAX_SUGGESTIONS:
+                    break
+
+        return tuple(found)
+
+    def fuzzy(self, query: str, limit: int = MAX_SUGGESTIONS) -> Tuple[int, ...]:
+        """Ids of the best choices sharing n-grams with the query, ignoring case.
+        Choices sharing more n-grams rank first, then by weight.
+
+        Postings are read by descending weight, a block at a time, and the
+        reading stops once `limit` choices miss at most one n-gram of the query.
+
+        Args:
+            query (str): The query.
+            limit (int, optional): Maximum number of ids. Defaults to 25.
+
+        Returns:
+            Tuple[int, ...]
+        """
+        if self._grams is None:
+            return ()
+
+        grams = set(_ngrams(query.casefold(), self.ngram))
+        postings = [i for i in map(self._grams.get, grams) if i is not None]
+        if not postings:
+            return ()
+
+        # enough close matches end the reading, the choices left have a lower weight
+        close = max(1, len(grams) - 1)
+        longest = max(map(len, postings))
+        scores: Counter[int] = Counter()
+        for start in range(0, longest, _POSTINGS_BLOCK):
+            end = start + _POSTINGS_BLOCK
+            scores.update(chain.from_iterable(i[start:end] for i in postings))
+            if end < longest and sum(map(close.__le__, scores.values())) >= limit:
+                break
+
+        # choices sharing less than half the n-grams of the best match are noise
+        threshold = (max(scores.values()) + 1) // 2
+        candidates = list(compress(scores, map(threshold.__le__, scores.values())))
+
+        # by score then weight, both sorts stable and keyed without a Python call
+        candidates.sort(key=self.weights.__getitem__, reverse=True)
+        candidates.sort(key=scores.__getitem__, reverse=True)
+        return tuple(candidates[:limit])
+
+    def search(
+        self, query: str, limit: int = MAX_SUGGESTIONS
+    ) -> List[ApplicationCommandOptionChoice]:
+        """Get the best choices for what the user has typed so far.
+        Prefix matches come first, fuzzy matches fill up the rest.
+
+        Args:
+            query (str): Value of the focused option.
+            limit (int, optional): Maximum number of choices. Defaults to 25.
+
+        Returns:
+            List[ApplicationCommandOptionChoice]
+        """
+        query = query.strip().casefold()
+        limit = min(limit, MAX_SUGGESTIONS)
+
+        found = None
+        if self._results is not None:
+            with self._lock:
+                found = self._results.get((query, limit), count=False)
+
+        if found is None:
+            ids = list(self.prefix(query)[:limit])
+            if len(ids) < limit and len(query) >= self.ngram:
+                seen = set(ids)
+                for i in self.fuzzy(query, limit=limit):
+                    if i not in seen:
+                        ids.append(i)
+                        if len(ids) == limit:
+                            break
+
+            found = tuple(ids)
+            if self._results is not None:
+                with self._lock:
+                    self._results.set((query, limit), found)
+
+        return [self.choices[i] for i in found]
+
+
+def _to_choice(choice: Choice) -> ApplicationCommandOptionChoice:
+    if isinstance(choice, ApplicationCommandOptionChoice):
+        return choice
+
+    if isinstance(choice, str):
+        return ApplicationCommandOptionChoice(choice, choice)
+
+    return ApplicationCommandOptionChoice(*choice)
+
+
+def _ngrams(text: str, n: int) -> Iterable[str]:
+    return (text[i : i + n] for i in range(len(text) - n + 1))
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Iterable, List, Tuple, TypeVar
+
+from disinter.errors import APIError
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING: Any = object()
+
+
+class TTLCache(Generic[K, V]):
+    def __init__(self, maxsize: int, ttl: float | None = None) -> None:
+        """Size bounded LRU cache with an optional time to live.
+        Lookups, inserts and evictions are all O(1).
+
+        Args:
+            maxsize (int): Maximum number of entries.
+            ttl (float | None, optional): Seconds an entry stays valid after it is set. If None, entries never expire. Defaults to None.
+        """
+        if maxsize <= 0:
+            raise ValueError("`maxsize` must be greater than 0")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._data: OrderedDict[K, Tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, _MISSING, count=False) is not _MISSING
+
+    def get(self, key: K, default: Any = None, count: bool = True) -> V | Any:
+        """Get the value of a key.
+
+        Args:
+            key (K): Key of the entry.
+            default (Any, optional): Returned if the key is missing or expired. Defaults to None.
+            count (bool, optional): Count the lookup in the hit and miss stats. Defaults to True.
+
+        Returns:
+            V | Any
+        """
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at >= time.monotonic():
+                self._data.move_to_end(key)
+                if count:
+                    self.hits += 1
+                return value
+
+            del self._data[key]
+
+        if count:
+            self.misses += 1
+        return default
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Set the value of a key, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key (K): Key of the entry.
+            value (V): Value of the entry.
+            ttl (float | None, optional): Time to live of this entry. Defaults to None, the cache's `ttl`.
+        """
+        if ttl is None:
+            ttl = self.ttl
+
+        now = time.monotonic()
+        self._data[key] = (now + ttl if ttl is not None else float("inf"), value)
+        self._data.move_to_end(key)
+
+        self._evict(now)
+
+    def set_many(self, items: Iterable[Tuple[K, V, float | None]]) -> None:
+        """Set several keys at once, with a single eviction pass.
+
+        Args:
+            items (Iterable[Tuple[K, V, float | None]]): Keys, values and time to live, None for the cache's `ttl`.
+        """
+        now = time.monotonic()
+        data = self._data
+        for key, value, ttl in items:
+            if ttl is None:
+                ttl = self.ttl
+
+            data[key] = (now + ttl if ttl is not None else float("inf"), value)
+            data.move_to_end(key)
+
+        self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        # drop expired entries at the head, then the least recently used ones
+        while self._data:
+            oldest = next(iter(self._data.values()))
+            if oldest[0] >= now and len(self._data) <= self.maxsize:
+                break
+
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K, default: Any = None) -> V | Any:
+        """Remove a key and return its value."""
+
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+
+        return entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and eviction counters and the current size of the cache."""
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+        }
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        ttl: float | None = 60,
+        maxsize: int = 256,
+        by_locale: bool = False,
+        by_guild: bool = False,
+    ) -> None:
+        """Memoizes the encoded responses of a deterministic handler, keyed by
+        the command path and its option values (or the component's custom_id and values).
+
+        Args:
+            ttl (float | None, optional): Seconds a response stays cached. If None, until evicted. Defaults to 60.
+            maxsize (int, optional): Maximum number of cached responses. Defaults to 256.
+            by_locale (bool, optional): Cache separately per user locale. Defaults to False.
+            by_guild (bool, optional): Cache separately per guild. Defaults to False.
+        """
+        self.by_locale = by_locale
+        self.by_guild = by_guild
+
+        self._cache: TTLCache[Hashable, bytes] = TTLCache(maxsize, ttl)
+
+    def key(
+        self, route_key: Hashable, interaction: Dict[str, Any], options: Any
+    ) -> Hashable:
+        """Build the cache key of an interaction.
+
+        Args:
+            route_key (Hashable): Key of the matched route.
+            interaction (Dict[str, Any]): The interaction.
+            options (Any): Options passed to the handler's context.
+
+        Returns:
+            Hashable
+        """
+        data = interaction["data"]
+
+        args: Hashable
+        if "custom_id" in data:
+            args = (data["custom_id"], tuple(data.get("values") or ()))
+        else:
+            args = _freeze_options(options)
+
+        key: Tuple[Hashable, ...] = (route_key, args)
+        if self.by_locale:
+            key += (interaction.get("locale"),)
+        if self.by_guild:
+            key += (interaction.get("guild_id"),)
+
+        return key
+
+    def get(self, key: Hashable) -> bytes | None:
+        return self._cache.get(key)
+
+    def set(self, key: Hashable, content: bytes) -> None:
+        self._cache.set(key, content)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and eviction counters and the current size of the cache."""
+
+        return self._cache.stats
+
+
+# default seconds an entity stays cached, per resource
+ENTITY_TTLS: Dict[str, float] = {
+    "user": 300,
+    "channel": 60,
+    "guild": 120,
+    # only known from the interactions, members are keyed by `guild_id:user_id`
+    "member": 60,
+    "role": 60,
+    "partial_channel": 60,
+}
+
+
+class _NotFound:
+    __slots__ = ("error",)
+
+    def __init__(self, error: Any) -> None:
+        self.error = error
+
+
+class EntityCache:
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        ttls: Dict[str, float] | None = None,
+        negative_ttl: float | None = 30,
+        from_interactions: bool = True,
+    ) -> None:
+        """Read-through cache of the users, channels and guilds fetched from the API,
+        keyed by resource and id. Ids that do not exist (404) are cached too.
+
+        The users, members, roles and partial channels that interactions carry
+        are added as they arrive, for free.
+
+        Args:
+            maxsize (int, optional): Maximum number of entities, the least recently used ones are evicted. Defaults to 4096.
+            ttls (Dict[str, float] | None, optional): Seconds an entity stays cached, per resource (`user`, `channel`, `guild`). Defaults to None, `ENTITY_TTLS`.
+            negative_ttl (float | None, optional): Seconds a missing id is remembered. If None, they are not cached. Defaults to 30.
+            from_interactions (bool, optional): Add the entities of the incoming interactions. Defaults to True.
+        """
+        self.ttls = {**ENTITY_TTLS, **(ttls or {})}
+        self.negative_ttl = negative_ttl
+        self.from_interactions = from_interactions
+
+        self.negative_hits = 0
+        self.populated = 0
+
+        self._cache: TTLCache[Tuple[str, str], Any] = TTLCache(maxsize)
+        # the sync client is called from the handler threads
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, resource: str, id: Any) -> Any:
+        """Get a cached entity.
+
+        Raises:
+            APIError: If the id is cached as missing.
+
+        Returns:
+            Any: The entity, None if it is not cached.
+        """
+        with self._lock:
+            value = self._cache.get((resource, str(id)))
+
+        if isinstance(value, _NotFound):
+            self.negative_hits += 1
+            raise APIError(value.error, 404)
+
+        return value
+
+    def set(self, resource: str, id: Any, value: Any) -> None:
+        """Cache an entity for the ttl of its resource."""
+
+        with self._lock:
+            self._cache.set((resource, str(id)), value, self.ttls.get(resource))
+
+    def set_missing(self, resource: str, id: Any, error: Any) -> None:
+        """Remember that an id does not exist, with the error of the API."""
+
+        if self.negative_ttl is None:
+            return
+
+        with self._lock:
+            self._cache.set((resource, str(id)), _NotFound(error), self.negative_ttl)
+
+    def add_interaction(self, interaction: Dict[str, Any]) -> None:
+        """Add the users, members, roles and partial channels of an interaction:
+        its caller and the `data.resolved` objects. Resolved messages are skipped.
+
+        The typed structs of `typed_payloads` are stored as dicts, like the API's entities."""
+
+        ttls = self.ttls
+        entities: List[Tuple[Tuple[str, str], Any, float | None]] = []
+
+        def add(resource: str, id: str, value: Any) -> None:
+            if not isinstance(value, dict):
+                value = _to_builtins(value)
+
+            entities.append(((resource, id), value, ttls.get(resource)))
+
+        guild_id = interaction.get("guild_id")
+
+        member = interaction.get("member")
+        if member is not None:
+            user = member.get("user")
+            if user is not None:
+                add("user", user["id"], user)
+                add("member", f"{guild_id}:{user['id']}", member)
+
+        user = interaction.get("user")
+        if user is not None:
+            add("user", user["id"], user)
+
+        data = interaction.get("data")
+        resolved = data.get("resolved") if data is not None else None
+        if resolved is not None:
+            for id, value in (resolved.get("users") or {}).items():
+                add("user", id, value)
+            if guild_id is not None:
+                for id, value in (resolved.get("members") or {}).items():
+                    add("member", f"{guild_id}:{id}", value)
+            for id, value in (resolved.get("roles") or {}).items():
+                add("role", id, value)
+            for id, value in (resolved.get("channels") or {}).items():
+                add("partial_channel", id, value)
+
+        if not entities:
+            return
+
+        with self._lock:
+            self._cache.set_many(entities)
+
+        self.populated += len(entities)
+
+    def invalidate(self, resource: str | None = None, id: Any = None) -> None:
+        """Drop an entity, every entity of a resource, or everything.
+
+        Args:
+            resource (str | None, optional): Resource to invalidate. If None, the whole cache. Defaults to None.
+            id (Any, optional): Id to invalidate. If None, every entity of the resource. Defaults to None.
+        """
+        with self._lock:
+            if resource is None:
+                self._cache.clear()
+            elif id is not None:
+                self._cache.pop((resource, str(id)))
+            else:
+                for key in [i for i in self._cache._data if i[0] == resource]:
+                    self._cache.pop(key)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and eviction counters, hits of missing ids, entities added
+        from interactions and the current size of the cache."""
+
+        return {
+            **self._cache.stats,
+            "negative_hits": self.negative_hits,
+            "populated": self.populated,
+        }
+
+
+def _to_builtins(value: Any) -> Any:
+    # only typed payloads are not dicts, and they require msgspec
+    import msgspec
+
+    return msgspec.to_builtins(value)
+
+
+def _freeze_options(options: Any) -> Hashable:
+    # options are normalized by name so that their order does not matter
+    if not options:
+        return ()
+
+    return tuple(
+        sorted(
+            (i["name"], i.get("value"), _freeze_options(i.get("options")))
+            for i in options
+        )
+    )
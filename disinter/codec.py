@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict
+
+
+class JSONCodec:
+    def __init__(
+        self,
+        name: str,
+        dumps: Callable[[Any], bytes],
+        loads: Callable[[bytes | str], Any],
+    ) -> None:
+        """JSON encoder and decoder pair used by the interactions pipeline.
+
+        Args:
+            name (str): Name of the codec.
+            dumps (Callable[[Any], bytes]): Encodes an object to compact JSON bytes.
+            loads (Callable[[bytes | str], Any]): Decodes JSON bytes to an object.
+        """
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self) -> str:
+        return f"<JSONCodec {self.name}>"
+
+
+def _stdlib_codec() -> JSONCodec:
+    encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+    def dumps(obj: Any) -> bytes:
+        return encoder.encode(obj).encode("utf-8")
+
+    return JSONCodec("json", dumps, json.loads)
+
+
+def _orjson_codec() -> JSONCodec:
+    import orjson
+
+    return JSONCodec("orjson", orjson.dumps, orjson.loads)
+
+
+def _msgspec_codec() -> JSONCodec:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    return JSONCodec("msgspec", encoder.encode, decoder.decode)
+
+
+CODECS: Dict[str, Callable[[], JSONCodec]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _stdlib_codec,
+}
+
+
+def get_codec(codec: str | JSONCodec | None = None) -> JSONCodec:
+    """Get a JSON codec.
+
+    Args:
+        codec (str | JSONCodec | None, optional): Name of the codec (`orjson`, `msgspec` or `json`) or a custom codec.
+            If None, the fastest installed codec is used. Defaults to None.
+
+    Raises:
+        ValueError: If the codec name is unknown.
+        ImportError: If the named codec is not installed.
+
+    Returns:
+        JSONCodec
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+
+    if codec is not None:
+        if codec not in CODECS:
+            raise ValueError(
+                f"Unknown JSON codec {codec!r}, expected one of {list(CODECS)}"
+            )
+
+        return CODECS[codec]()
+
+    for factory in CODECS.values():
+        try:
+            return factory()
+        except ImportError:
+            continue
+
+    return _stdlib_codec()
+
+
+# fastest codec available at import time
+default_codec = get_codec()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, NewType
+from typing import Dict, List, NewType
+
+from disinter.serializer import BaseJSON
 
 ApplicationCommandOptionType = NewType("ApplicationCommandOptionType", int)
 
@@ -32,7 +34,9 @@ ApplicationCommandTypeUser = ApplicationCommandType(2)  # USER
 ApplicationCommandTypeMessage = ApplicationCommandType(3)  # MESSAGE
 
 
-class ApplicationCommandOptionChoice:
+class ApplicationCommandOptionChoice(BaseJSON):
+    __slots__ = ("name", "value", "name_localizations")
+
     def __init__(
         self,
         name: str,
@@ -43,17 +47,25 @@ class ApplicationCommandOptionChoice:
         self.value = value
         self.name_localizations = name_localizations
 
-    def _to_json(self) -> Dict[str, Any]:
-        attrs = vars(self)
-        json: Dict[str, Any] = {}
-        for key, value in attrs.items():
-            if value is not None:
-                json[key] = value
-
-        return json
 
+class ApplicationCommandOption(BaseJSON):
+    __slots__ = (
+        "type",
+        "name",
+        "description",
+        "name_localizations",
+        "description_localizations",
+        "required",
+        "choices",
+        "channel_types",
+        "min_value",
+        "max_value",
+        "min_length",
+        "max_length",
+        "autocomplete",
+    )
+    _json_lists = ("choices",)
 
-class ApplicationCommandOption:
     def __init__(
         self,
         type: ApplicationCommandOptionType,
@@ -84,26 +96,23 @@ class ApplicationCommandOption:
         self.max_length = max_length
         self.autocomplete = autocomplete
 
-    def _to_json(self):
-        attrs = vars(self)
-        json: Dict[str, Any] = {}
-        for key, value in attrs.items():
-            if value is not None:
-                # parsing list classes
-                if isinstance(value, list):
-                    list_arr: List[Dict[str, Any]] = []
-                    for i in value:
-                        list_arr.append(i._to_json())
-                    json[key] = list_arr
-
-                    continue
-
-                json[key] = value
 
-        return json
+class ApplicationCommand(BaseJSON):
+    __slots__ = (
+        "name",
+        "description",
+        "type",
+        "id",
+        "application_id",
+        "name_localizations",
+        "description_localizations",
+        "options",
+        "default_member_permissions",
+        "dm_permission",
+        "version",
+    )
+    _json_lists = ("options",)
 
-
-class ApplicationCommand:
     def __init__(
         self,
         name: str,
@@ -131,21 +140,3 @@ class ApplicationCommand:
         self.default_member_permissions = default_member_permissions
         self.dm_permission = dm_permission
         self.version = version
-
-    def _to_json(self) -> Dict[str, Any]:
-        attrs = vars(self)
-        json: Dict[str, Any] = {}
-        for key, value in attrs.items():
-            if value is not None:
-                # parsing list classes
-                if isinstance(value, list):
-                    list_arr: List[Dict[str, Any]] = []
-                    for i in value:
-                        list_arr.append(i._to_json())
-                    json[key] = list_arr
-
-                    continue
-
-                json[key] = value
-
-        return json
@@ -1,22 +1,15 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, NewType, Union
+from typing import List, NewType, Union
 
 from typing_extensions import Self
 
-
-class BaseJSON:
-    def _to_json(self):
-        attrs = vars(self)
-        json: Dict[str, Any] = {}
-        for key, value in attrs.items():
-            if value is not None:
-                json[key] = value
-
-        return json
+from disinter.serializer import BaseJSON
 
 
 class EmbedFooter(BaseJSON):
+    __slots__ = ("text", "icon_url", "proxy_icon_url")
+
     def __init__(
         self, text: str, icon_url: str = None, proxy_icon_url: str = None
     ) -> None:
@@ -26,6 +19,8 @@ class EmbedFooter(BaseJSON):
 
 
 class EmbedImage(BaseJSON):
+    __slots__ = ("url", "proxy_url", "height", "width")
+
     def __init__(
         self, url: str, proxy_url: str = None, height: int = None, width: int = None
     ) -> None:
@@ -36,6 +31,8 @@ class EmbedImage(BaseJSON):
 
 
 class EmbedThumbnail(BaseJSON):
+    __slots__ = ("url", "proxy_url", "height", "width")
+
     def __init__(
         self, url: str, proxy_url: str = None, height: int = None, width: int = None
     ) -> None:
@@ -46,6 +43,8 @@ class EmbedThumbnail(BaseJSON):
 
 
 class EmbedVideo(BaseJSON):
+    __slots__ = ("url", "proxy_url", "height", "width")
+
     def __init__(
         self, url: str, proxy_url: str = None, height: int = None, width: int = None
     ) -> None:
@@ -56,12 +55,16 @@ class EmbedVideo(BaseJSON):
 
 
 class EmbedProvider(BaseJSON):
+    __slots__ = ("name", "url")
+
     def __init__(self, name: str = None, url: str = None) -> None:
         self.name = name
         self.url = url
 
 
 class EmbedAuthor(BaseJSON):
+    __slots__ = ("name", "url", "icon_url", "proxy_icon_url")
+
     def __init__(
         self,
         name: str,
@@ -76,13 +79,33 @@ class EmbedAuthor(BaseJSON):
 
 
 class EmbedField(BaseJSON):
+    __slots__ = ("name", "value", "inline")
+
     def __init__(self, name: str, value: str, inline: bool = None) -> None:
         self.name = name
         self.value = value
         self.inline = inline
 
 
-class Embed:
+class Embed(BaseJSON):
+    __slots__ = (
+        "title",
+        "type",
+        "description",
+        "url",
+        "timestamp",
+        "color",
+        "footer",
+        "image",
+        "thumbnail",
+        "video",
+        "provider",
+        "author",
+        "fields",
+    )
+    _json_nested = ("footer", "image", "thumbnail", "video", "provider", "author")
+    _json_lists = ("fields",)
+
     def __init__(
         self,
         title: str = None,
@@ -113,35 +136,10 @@ class Embed:
         self.author = author
         self.fields = fields
 
-    def _to_json(self):
-        attrs = vars(self)
-        json: Dict[str, Any] = {}
-        for key, value in attrs.items():
-            if value is not None:
-                # custom class
-                if key in [
-                    "footer",
-                    "image",
-                    "thumbnail",
-                    "video",
-                    "provider",
-                    "author",
-                ]:
-                    json[key] = value._to_json()
-                    continue
-
-                # list class
-                if key == "fields":
-                    fields = [i._to_json() for i in self.fields]
-                    json[key] = fields
-                    continue
-
-                json[key] = value
-
-        return json
-
 
 class Emoji(BaseJSON):
+    __slots__ = ("id", "name", "animated")
+
     def __init__(self, id: str = None, name: str = None, animated: bool = None) -> None:
         self.id = id
         self.name = name
@@ -156,7 +154,10 @@ class ButtonStyles:
     Link = 5
 
 
-class ComponentButton:
+class ComponentButton(BaseJSON):
+    __slots__ = ("type", "style", "label", "emoji", "custom_id", "url", "disabled")
+    _json_nested = ("emoji",)
+
     def __init__(
         self,
         style: int,
@@ -174,19 +175,6 @@ class ComponentButton:
         self.url = url
         self.disabled = disabled
 
-    def _to_json(self):
-        attrs = vars(self)
-        json: Dict[str, Any] = {}
-        for key, value in attrs.items():
-            if value is not None:
-                if key == "emoji":
-                    json[key] = value._to_json()
-                    continue
-
-                json[key] = value
-
-        return json
-
 
 ComponentSelectMenuType = NewType("ComponentSelectMenuType", int)
 ComponentSelectMenuTypeText = ComponentSelectMenuType(3)
@@ -196,7 +184,10 @@ ComponentSelectMenuTypeMentionable = ComponentSelectMenuType(7)
 ComponentSelectMenuTypeChannels = ComponentSelectMenuType(8)
 
 
-class ComponentSelectMenuOption:
+class ComponentSelectMenuOption(BaseJSON):
+    __slots__ = ("label", "value", "description", "emoji", "default")
+    _json_nested = ("emoji",)
+
     def __init__(
         self,
         label: str,
@@ -211,21 +202,20 @@ class ComponentSelectMenuOption:
         self.emoji = emoji
         self.default = default
 
-    def _to_json(self):
-        attrs = vars(self)
-        json: Dict[str, Any] = {}
-        for key, value in attrs.items():
-            if value is not None:
-                if key == "emoji":
-                    json[key] = value._to_json()
-                    continue
-
-                json[key] = value
-
-        return json
 
+class ComponentSelectMenu(BaseJSON):
+    __slots__ = (
+        "type",
+        "custom_id",
+        "options",
+        "channel_types",
+        "placeholder",
+        "min_values",
+        "max_vales",
+        "disabled",
+    )
+    _json_lists = ("options",)
 
-class ComponentSelectMenu:
     def __init__(
         self,
         type: ComponentSelectMenuType,
@@ -246,19 +236,6 @@ class ComponentSelectMenu:
         self.max_vales = max_vales
         self.disabled = disabled
 
-    def _to_json(self):
-        attrs = vars(self)
-        json: Dict[str, Any] = {}
-        for key, value in attrs.items():
-            if value is not None:
-                if key == "options":
-                    json[key] = [i._to_json() for i in self.options]
-                    continue
-
-                json[key] = value
-
-        return json
-
 
 ComponentTextInputStyle = NewType("ComponentTextInputStyle", int)
 ComponentTextInputStyleShort = ComponentTextInputStyle(1)
@@ -266,6 +243,18 @@ ComponentTextInputStyleParagraph = ComponentTextInputStyle(2)
 
 
 class ComponentTextInput(BaseJSON):
+    __slots__ = (
+        "type",
+        "custom_id",
+        "style",
+        "label",
+        "min_length",
+        "max_length",
+        "required",
+        "value",
+        "placeholder",
+    )
+
     def __init__(
         self,
         custom_id: str,
@@ -288,19 +277,16 @@ class ComponentTextInput(BaseJSON):
         self.placeholder = placeholder
 
 
-class ComponentActionRows:
+class ComponentActionRows(BaseJSON):
+    __slots__ = ("type", "components")
+    _json_lists = ("components",)
+
     def __init__(
         self, components: List[ComponentButton | ComponentSelectMenu | ComponentTextInput | Self]  # type: ignore
     ) -> None:
         self.type = 1
         self.components = components
 
-    def _to_json(self):
-        return {
-            "type": self.type,
-            "components": [i._to_json() for i in self.components],
-        }
-
 
 Components = Union[ComponentButton, ComponentSelectMenu, ComponentActionRows]
 
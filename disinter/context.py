@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+from functools import cached_property
 from typing import Any, Dict, Generic, List, TypeVar
 
+from disinter.cache import EntityCache
+from disinter.command import ApplicationCommandOptionChoice
 from disinter.components import Components, Embed
+from disinter.errors import APIError
 from disinter.response import (
+    AutocompleteResponseData,
     DiscordResponse,
     InteractionCallback,
     ModalResponseData,
@@ -16,6 +21,7 @@ from disinter.types import (
     InteractionModalSubmit,
     Member,
     Message,
+    Role,
     User,
 )
 from disinter.types.interaction import ComponentActionRows, ComponentTextInput
@@ -29,17 +35,122 @@ T = TypeVar(
 
 
 class InteractionContext(Generic[T]):
+    # the app's `EntityCache`, set before the handler runs if the app has one
+    cache: EntityCache | None = None
+
     def __init__(self, interaction: T) -> None:
+        # derived fields are computed on first access, most handlers only read a few
         self.interaction: T = interaction
 
-        self.guild_id = interaction.get("guild_id")
-        self.channel_id = interaction.get("channel_id")
-        self.application_id = interaction.get("application_id")
+    def __getstate__(self) -> Dict[str, Any]:
+        # the cache belongs to this process, `process` handlers only get the interaction
+        state = self.__dict__.copy()
+        state.pop("cache", None)
+        return state
+
+    @cached_property
+    def data(self) -> Any:
+        return self.interaction.get("data")
+
+    @cached_property
+    def guild_id(self) -> str | None:
+        return self.interaction.get("guild_id")
+
+    @cached_property
+    def channel_id(self) -> str | None:
+        return self.interaction.get("channel_id")
+
+    @cached_property
+    def application_id(self) -> str:
+        return self.interaction.get("application_id")  # type: ignore
+
+    @cached_property
+    def member(self) -> Member | None:
+        # the one who called the command, in a guild
+        return self.interaction.get("member")
+
+    @cached_property
+    def user(self) -> User | None:
+        # user who called the command, in a dm
+        return self.interaction.get("user")
+
+    def get_user(self, user_id: str) -> User | None:
+        """Get a user without a request: from the cache, or the caller and
+        resolved users of this interaction.
+
+        Args:
+            user_id (str): Id of the user.
+
+        Returns:
+            User | None: The user, None if it is not known.
+        """
+        user = self._cached("user", user_id)
+        if user is not None:
+            return user
+
+        member = self.interaction.get("member")
+        caller = (
+            member.get("user") if member is not None else self.interaction.get("user")
+        )
+        if caller is not None and caller["id"] == user_id:
+            return caller
+
+        return self._resolved("users", user_id)
+
+    def get_member(self, user_id: str) -> Member | None:
+        """Get a member of the interaction's guild without a request: from the cache,
+        or the caller and resolved members of this interaction.
+        Resolved members are partial, they have no `user`.
+
+        Args:
+            user_id (str): Id of the member's user.
+
+        Returns:
+            Member | None: The member, None if it is not known or not in a guild.
+        """
+        if self.guild_id is None:
+            return None
+
+        member = self._cached("member", f"{self.guild_id}:{user_id}")
+        if member is not None:
+            return member
+
+        member = self.interaction.get("member")
+        if member is not None and member["user"]["id"] == user_id:
+            return member
+
+        return self._resolved("members", user_id)
+
+    def get_role(self, role_id: str) -> Role | None:
+        """Get a role without a request: from the cache, or the resolved roles of this interaction.
+
+        Args:
+            role_id (str): Id of the role.
+
+        Returns:
+            Role | None: The role, None if it is not known.
+        """
+        role = self._cached("role", role_id)
+        if role is not None:
+            return role
+
+        return self._resolved("roles", role_id)
 
-        self.member = interaction.get(
-            "member"
-        )  # the one who called the command, in a guild
-        self.user = interaction.get("user")  # user who called the command, in a dm
+    def _cached(self, resource: str, id: str) -> Any:
+        if self.cache is None:
+            return None
+
+        try:
+            return self.cache.get(resource, id)
+        except APIError:
+            # cached as missing by a request, the interaction may still have it
+            return None
+
+    def _resolved(self, kind: str, id: str) -> Any:
+        data = self.interaction.get("data")
+        resolved = data.get("resolved") if data is not None else None
+        objects = resolved.get(kind) if resolved is not None else None
+        return objects.get(id) if objects is not None else None
 
     def reply_modal(self, custom_id: str, title: str, components: List[Components]):
         """Send a modal response to the interaction.
@@ -110,60 +221,110 @@ class SlashContext(InteractionContext):
     ) -> None:
         super().__init__(interaction)
 
-        self.data = interaction.get("data")
+        self._options = options
 
-        self.options: Dict[str, InteractionDataOption] = {
-            i["name"]: i for i in options or []
-        }
+    @cached_property
+    def options(self) -> Dict[str, InteractionDataOption]:
+        return {i["name"]: i for i in self._options or []}
 
 
-class UserContext(InteractionContext):
-    def __init__(self, interaction: InteractionApplicationCommand) -> None:
-        super().__init__(interaction)
+class AutocompleteContext(SlashContext):
+    @cached_property
+    def focused(self) -> InteractionDataOption | None:
+        # the option the user is typing in
+        for i in self._options or []:
+            if i.get("focused"):
+                return i
+
+        return None
+
+    @cached_property
+    def value(self) -> str:
+        # what the user has typed so far
+        if self.focused is None:
+            return ""
+
+        return str(self.focused.get("value", ""))
+
+    def suggest(self, choices: List[ApplicationCommandOptionChoice]):
+        """Send the suggestions for the focused option.
+
+        Args:
+            choices (List[ApplicationCommandOptionChoice]): Suggested choices, only the first 25 are sent.
+
+        Returns:
+            DiscordResponse: Response wrapper class.
+        """
+        return DiscordResponse(
+            type=InteractionCallback.ApplicationCommandAutocompleteResult,
+            data=AutocompleteResponseData(choices=choices[:25]),
+        )
 
-        self.data = interaction.get("data")
 
+class UserContext(InteractionContext):
+    @cached_property
+    def user(self) -> User:
         # this is the target user
-        self.user: User = interaction["data"]["resolved"]["users"][
-            interaction["data"]["target_id"]
-        ]
+        data = self.interaction["data"]
+        return data["resolved"]["users"][data["target_id"]]
+
+    @cached_property
+    def member(self) -> Member:
         # partial member
-        self.member: Member = interaction["data"]["resolved"]["members"][
-            interaction["data"]["target_id"]
-        ]
+        data = self.interaction["data"]
+        return data["resolved"]["members"][data["target_id"]]
 
 
 class MessageContext(InteractionContext):
-    def __init__(self, interaction: InteractionApplicationCommand) -> None:
-        super().__init__(interaction)
-
-        self.data = interaction.get("data")
-
+    @cached_property
+    def message(self) -> Message:
         # this is the target message
-        self.message: Message = interaction["data"]["resolved"]["messages"][
-            interaction["data"]["target_id"]
-        ]
+        data = self.interaction["data"]
+        return data["resolved"]["messages"][data["target_id"]]
 
 
 class ComponentContext(InteractionContext):
-    def __init__(self, interaction: InteractionMessageComponent) -> None:
+    def __init__(
+        self,
+        interaction: InteractionMessageComponent,
+        params: Dict[str, str] | None = None,
+        state: Dict[str, Any] | None = None,
+    ) -> None:
         super().__init__(interaction)
 
-        self.data = interaction.get("data")
+        # parameters of the matched custom_id pattern
+        self.params: Dict[str, str] = params if params is not None else {}
+
+        # packed into the custom_id, decoded by the handler's `StateCodec`
+        self.state = state
 
 
 class ModalSubmitContext(InteractionContext):
-    def __init__(self, interaction: InteractionModalSubmit) -> None:
+    def __init__(
+        self,
+        interaction: InteractionModalSubmit,
+        params: Dict[str, str] | None = None,
+        state: Dict[str, Any] | None = None,
+    ) -> None:
         super().__init__(interaction)
 
-        self.data = interaction.get("data")
-        self.values: Dict[str, str] = {}
+        # parameters of the matched custom_id pattern
+        self.params: Dict[str, str] = params if params is not None else {}
+
+        # packed into the custom_id, decoded by the handler's `StateCodec`
+        self.state = state
+
+    @cached_property
+    def values(self) -> Dict[str, str]:
+        values: Dict[str, str] = {}
 
         try:
-            components: List[ComponentActionRows] = interaction["data"]["components"]  # type: ignore
+            components: List[ComponentActionRows] = self.interaction["data"]["components"]  # type: ignore
             for i in components:
                 comps: List[ComponentTextInput] = i.get("components")  # type: ignore
                 for x in comps:
-                    self.values[x["custom_id"]] = x["value"]
+                    values[x["custom_id"]] = x["value"]
         except Exception as e:
             print(f"Error parsing problem modal input values: {str(e)}")
+
+        return values
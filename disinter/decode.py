@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import sys
+import types
+import typing
+from typing import Any, Callable, Dict, ForwardRef, List, Tuple, Union
+
+import msgspec
+from msgspec import UNSET, UnsetType
+from typing_extensions import Self
+
+from disinter.types import interaction as interaction_types
+
+if sys.version_info < (3, 10):
+    # the `X | None` annotations of `disinter.types` can only be evaluated since 3.10
+    raise ImportError("Typed decoding of interactions requires Python 3.10 or newer")
+
+
+class TypedObject(msgspec.Struct, kw_only=True, omit_defaults=True):
+    """Base of the structs generated from the `disinter.types` definitions.
+    They can be read like the dicts they replace, absent fields are `UNSET`."""
+
+    def _lookup(self, key: str) -> Any:
+        if key in self.__struct_fields__ or key == self.__struct_config__.tag_field:
+            return getattr(self, key)
+
+        return UNSET
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._lookup(key)
+        if value is UNSET:
+            raise KeyError(key)
+
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self._lookup(key) is not UNSET
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(key)
+        if value is UNSET:
+            return default
+
+        return value
+
+
+class LazyField:
+    def __init__(self, member: Any, decoder: msgspec.json.Decoder) -> None:
+        """Struct field kept as raw JSON until it is first read.
+
+        Args:
+            member (Any): Slot descriptor of the field.
+            decoder (msgspec.json.Decoder): Decoder of the field's type.
+        """
+        self.member = member
+        self.decoder = decoder
+
+    def __get__(self, obj: Any, owner: type | None = None) -> Any:
+        if obj is None:
+            return self
+
+        value = self.member.__get__(obj, owner)
+        if isinstance(value, msgspec.Raw):
+            value = self.decoder.decode(value)
+            self.member.__set__(obj, value)
+
+        return value
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        self.member.__set__(obj, value)
+
+
+# sub-trees decoded on first access, the raw JSON references the request body
+LAZY_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "InteractionDataResolved": ("messages",),
+}
+
+# interaction structs and their `type`, which selects the struct when decoding
+INTERACTION_TAGS: Dict[str, Tuple[str, int]] = {
+    "Interaction": ("Interaction", 1),
+    "InteractionApplicationCommand": ("InteractionApplicationCommand", 2),
+    "InteractionAutocomplete": ("InteractionApplicationCommand", 4),
+    "InteractionMessageComponent": ("InteractionMessageComponent", 3),
+    "InteractionModalSubmit": ("InteractionModalSubmit", 5),
+}
+
+
+def _typeddicts() -> Dict[str, type]:
+    return {
+        k: v
+        for k, v in vars(interaction_types).items()
+        if isinstance(v, type)
+        and typing.is_typeddict(v)
+        and v.__module__ == interaction_types.__name__
+    }
+
+
+def _convert(
+    tp: Any, owner: str, typeddicts: Dict[str, type], structs: Dict[str, type] | None
+) -> Any:
+    # TypedDicts are replaced by their structs, by name until they all exist
+    if tp is Self:
+        tp = typeddicts[owner]
+
+    if isinstance(tp, type) and typing.is_typeddict(tp):
+        if structs is None:
+            return ForwardRef(tp.__name__)
+
+        return structs[tp.__name__]
+
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+
+    if origin in (Union, types.UnionType):
+        if sum(typing.is_typeddict(i) for i in args) > 1:
+            # untagged unions of objects (components) are left as dicts
+            args = tuple(i for i in args if not typing.is_typeddict(i)) + (
+                Dict[str, Any],
+            )
+
+        return Union[tuple(_convert(i, owner, typeddicts, structs) for i in args)]
+
+    if origin is list:
+        return List[_convert(args[0], owner, typeddicts, structs)]  # type: ignore
+
+    if origin is dict:
+        # JSON object keys are always strings
+        return Dict[str, _convert(args[1], owner, typeddicts, structs)]  # type: ignore
+
+    return tp
+
+
+def _generate() -> Dict[str, type]:
+    typeddicts = _typeddicts()
+    structs: Dict[str, type] = {}
+
+    definitions = {name: (name, None) for name in typeddicts}
+    definitions.update(INTERACTION_TAGS)
+
+    for name, (typeddict, tag) in definitions.items():
+        hints = typing.get_type_hints(typeddicts[typeddict])
+        lazy = LAZY_FIELDS.get(name, ())
+
+        fields = []
+        for field, tp in hints.items():
+            if tag is not None and field == "type":
+                continue
+
+            if field in lazy:
+                tp = msgspec.Raw
+            else:
+                tp = _convert(tp, typeddict, typeddicts, None)
+
+            fields.append((field, Union[tp, UnsetType], UNSET))
+
+        options: Dict[str, Any] = {}
+        if tag is not None:
+            options = {
+                "tag_field": "type",
+                "tag": tag,
+                "namespace": {
+                    "type": property(lambda self: self.__struct_config__.tag)
+                },
+            }
+
+        structs[name] = msgspec.defstruct(
+            name, fields, bases=(TypedObject,), module=__name__, **options
+        )
+
+    # the generated structs are resolved by name, and pickled, from this module
+    globals().update(structs)
+
+    for name, lazy in LAZY_FIELDS.items():
+        hints = typing.get_type_hints(typeddicts[name])
+        for field in lazy:
+            decoder = msgspec.json.Decoder(
+                _convert(hints[field], name, typeddicts, structs)
+            )
+            setattr(
+                structs[name], field, LazyField(vars(structs[name])[field], decoder)
+            )
+
+    return structs
+
+
+STRUCTS = _generate()
+
+_decoder = msgspec.json.Decoder(
+    Union[tuple(STRUCTS[name] for name in INTERACTION_TAGS)]  # type: ignore
+)
+
+
+def decode_interaction(body: bytes) -> TypedObject:
+    """Decode an interaction body into typed structs, in a single pass.
+    Unknown fields are skipped.
+
+    Args:
+        body (bytes): Raw request body.
+
+    Raises:
+        msgspec.ValidationError: If the body does not match the definitions.
+
+    Returns:
+        TypedObject: The interaction struct of its `type`.
+    """
+    return _decoder.decode(body)
+
+
+def make_interaction_decoder(
+    fallback: Callable[[bytes], Any]
+) -> Callable[[bytes], Any]:
+    """Get a function decoding interaction bodies into typed structs,
+    and with `fallback` if a body does not match the definitions.
+
+    Args:
+        fallback (Callable[[bytes], Any]): Decoder used for mismatched bodies.
+
+    Returns:
+        Callable[[bytes], Any]
+    """
+
+    def decode(body: bytes) -> Any:
+        try:
+            return _decoder.decode(body)
+        except msgspec.ValidationError:
+            return fallback(body)
+
+    return decode
@@ -1,15 +1,34 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import multiprocessing
 import os
-from typing import Any, Awaitable, Callable, Dict, List, Union
+import re
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Set,
+    Tuple,
+    Union,
+)
 
-from discord_interactions import InteractionResponseType, InteractionType, verify_key
+from discord_interactions import InteractionResponseType, InteractionType
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import Response
 from starlette.types import Receive, Scope, Send
 
 from disinter.api import DiscordAPI
+from disinter.cache import EntityCache, ResponseCache, TTLCache
+from disinter.codec import JSONCodec, default_codec, get_codec
 from disinter.command import (
     ApplicationCommand,
     ApplicationCommandOption,
@@ -19,72 +38,222 @@ from disinter.command import (
     ApplicationCommandTypeUser,
 )
 from disinter.context import (
+    AutocompleteContext,
     ComponentContext,
     MessageContext,
     ModalSubmitContext,
     SlashContext,
     UserContext,
 )
+from disinter.dispatch import (
+    COMPONENT_ROUTE_KINDS,
+    DEFERRED_RESPONSE_TYPES,
+    AutocompleteRouteKey,
+    ComponentRouteKey,
+    EphemeralRoutes,
+    PatternTrie,
+    Route,
+    RouteKey,
+    build_autocomplete_table,
+    build_command_table,
+    build_component_table,
+    build_pattern_table,
+    check_process_callback,
+    command_route_key,
+    is_pattern,
+    parse_pattern,
+)
 from disinter.errors import CommandNameExists
-from disinter.response import DiscordResponse
+from disinter.response import DiscordResponse, InteractionCallback, ResponseTemplate
+from disinter.state import StateCodec, StateError
+from disinter.sync import (
+    SyncPlan,
+    SyncProgress,
+    command_hash,
+    load_hashes,
+    plan_sync,
+    save_hashes,
+)
 from disinter.types import (
-    ComponentTypes,
     InteractionApplicationCommand,
     InteractionMessageComponent,
 )
 from disinter.types.interaction import InteractionModalSubmit
 from disinter.utils import validate_name
+from disinter.verify import SignatureVerifier
+
+if TYPE_CHECKING:
+    from disinter.async_api import AsyncDiscordAPI
+
+# what a handler callback returns
+HANDLER_RESPONSE = Union[DiscordResponse, ResponseTemplate]
 
 # slash command function callback type
 SLASH_CALLBACK_FUNCTION = Union[
-    Callable[[SlashContext], DiscordResponse],
-    Callable[[SlashContext], Awaitable[DiscordResponse]],
+    Callable[[SlashContext], HANDLER_RESPONSE],
+    Callable[[SlashContext], Awaitable[HANDLER_RESPONSE]],
 ]
 
 # user command function callback type
 USER_CALLBACK_FUNCTION = Union[
-    Callable[[UserContext], DiscordResponse],
-    Callable[[UserContext], Awaitable[DiscordResponse]],
+    Callable[[UserContext], HANDLER_RESPONSE],
+    Callable[[UserContext], Awaitable[HANDLER_RESPONSE]],
 ]
 
 # message command function callback type
 MESSAGE_CALLBACK_FUNCTION = Union[
-    Callable[[MessageContext], DiscordResponse],
-    Callable[[MessageContext], Awaitable[DiscordResponse]],
+    Callable[[MessageContext], HANDLER_RESPONSE],
+    Callable[[MessageContext], Awaitable[HANDLER_RESPONSE]],
+]
+
+
+# autocomplete function callback type
+AUTOCOMPLETE_CALLBACK_FUNCTION = Union[
+    Callable[[AutocompleteContext], HANDLER_RESPONSE],
+    Callable[[AutocompleteContext], Awaitable[HANDLER_RESPONSE]],
 ]
 
 
 # component function callback type
 COMPONENT_CALLBACK_FUNCTION = Union[
-    Callable[[ComponentContext], DiscordResponse],
-    Callable[[ComponentContext], Awaitable[DiscordResponse]],
+    Callable[[ComponentContext], HANDLER_RESPONSE],
+    Callable[[ComponentContext], Awaitable[HANDLER_RESPONSE]],
 ]
 
 
 # modal submit function callback type
 MODALSUBMIT_CALLBACK_FUNCTION = Union[
-    Callable[[ModalSubmitContext], DiscordResponse],
-    Callable[[ModalSubmitContext], Awaitable[DiscordResponse]],
+    Callable[[ModalSubmitContext], HANDLER_RESPONSE],
+    Callable[[ModalSubmitContext], Awaitable[HANDLER_RESPONSE]],
 ]
 
+logger = logging.getLogger(__name__)
+
+# where a sync handler callback can be executed
+HANDLER_EXECUTORS = ("thread", "inline", "process")
+
+# pre-encoded responses of the interactions endpoint
+PING_PATTERN = re.compile(rb'"type"\s*:\s*1\s*[,}]')
+PONG_RESPONSE = default_codec.dumps({"type": InteractionResponseType.PONG})
+COMMAND_NOT_DEFINED_RESPONSE = default_codec.dumps(
+    {"error": "Command not defined in app"}
+)
+COMPONENT_NOT_SET_RESPONSE = default_codec.dumps(
+    {"error": "Component wrapper callback function not set"}
+)
+MODALSUBMIT_NOT_SET_RESPONSE = default_codec.dumps(
+    {"error": "Modal submit wrapper callback function not set."}
+)
+AUTOCOMPLETE_NOT_SET_RESPONSE = default_codec.dumps(
+    {"error": "Autocomplete callback function not set"}
+)
+UNKNOWN_TYPE_RESPONSE = default_codec.dumps({"error": "Unknown type"})
+INVALID_STATE_RESPONSE = default_codec.dumps({"error": "Invalid component state"})
+
+
+class BaseHandler:
+    def __init__(
+        self,
+        callback: Callable[..., Any],
+        defer_after: float | None = None,
+        executor: str | None = None,
+        cache: ResponseCache | bool | None = None,
+        defer_ephemeral: bool = False,
+    ):
+        """Registered interaction handler.
+
+        Args:
+            callback (Callable[..., Any]): Handler function.
+            defer_after (float | None, optional): Seconds to wait for the handler before deferring the response. Defaults to None, the app's `defer_after`.
+            executor (str | None, optional): Where the callback runs, `thread` (the app's thread pool, sync callbacks only),
+                `inline` (on the event loop) or `process` (the app's process pool). Defaults to None, `thread`.
+            cache (ResponseCache | bool | None, optional): Memoize the encoded responses of the handler. `True` uses a default `ResponseCache`. Defaults to None.
+            defer_ephemeral (bool, optional): Send the deferred response with the `EPHEMERAL` flag. Discord keeps the flags of the original response when it is edited,
+                so a deferred ephemeral reply is only private if the deferral was. Defaults to False.
+        """
+        if executor is not None and executor not in HANDLER_EXECUTORS:
+            raise ValueError(
+                f"Unknown executor {executor!r}, expected one of {list(HANDLER_EXECUTORS)}"
+            )
+        if executor == "process":
+            # fails at registration rather than when the routes are compiled
+            check_process_callback(callback)
+
+        self._callback = callback
+        self.defer_after = defer_after
+        self.defer_ephemeral = defer_ephemeral
+        self.executor = executor
+
+        if cache is True:
+            cache = ResponseCache()
+        self.cache: ResponseCache | None = cache or None
+
+
+class Autocomplete(BaseHandler):
+    def __init__(
+        self,
+        option: str,
+        func: AUTOCOMPLETE_CALLBACK_FUNCTION,
+        executor: str | None = None,
+        cache: ResponseCache | bool | None = None,
+    ) -> None:
+        super().__init__(func, None, executor, cache)
+
+        self.option = option
+
+
+def _enable_autocomplete(
+    options: List[ApplicationCommandOption] | None, name: str
+) -> None:
+    # the option has to be flagged for Discord to send autocomplete interactions
+    for i in options or []:
+        if i.name == name:
+            i.autocomplete = True
+            return
+
+    raise ValueError(f"Unknown option {name!r}")
+
 
 class SlashSubgroup:
-    def __init__(self, name: str, description: str) -> None:
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        on_change: Callable[[], None] | None = None,
+    ) -> None:
         self.name = name
         self.description = description
 
         self._subcommands: Dict[str, SlashSubcommand] = {}
+        self._on_change = on_change
 
     def subcommand(
         self,
         name: str,
         description: str,
         options: List[ApplicationCommandOption] = None,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        cache: ResponseCache | bool | None = None,
+        defer_ephemeral: bool = False,
     ):
         def _subcommand(func: SLASH_CALLBACK_FUNCTION):
-            subcmd = SlashSubcommand(name, description, func, options)
+            subcmd = SlashSubcommand(
+                name,
+                description,
+                func,
+                options,
+                defer_after,
+                executor,
+                cache,
+                self._on_change,
+                defer_ephemeral,
+            )
 
             self._subcommands[name] = subcmd
+            if self._on_change is not None:
+                self._on_change()
+
             return self._subcommands[name]
 
         return _subcommand
@@ -99,19 +268,27 @@ class SlashSubgroup:
         }
 
 
-class SlashSubcommand:
+class SlashSubcommand(BaseHandler):
     def __init__(
         self,
         name: str,
         description: str,
         callback: SLASH_CALLBACK_FUNCTION,
         options: List[ApplicationCommandOption] = None,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        cache: ResponseCache | bool | None = None,
+        on_change: Callable[[], None] | None = None,
+        defer_ephemeral: bool = False,
     ) -> None:
+        super().__init__(callback, defer_after, executor, cache, defer_ephemeral)
+
         self.name = name
         self.description = description
         self.options = options
 
-        self._callback = callback
+        self._autocomplete: Dict[str, Autocomplete] = {}
+        self._on_change = on_change
 
     def _to_json(self):
         json: Dict[str, Any] = {
@@ -125,15 +302,54 @@ class SlashSubcommand:
 
         return json
 
+    def autocomplete(
+        self,
+        option: str,
+        executor: str | None = None,
+        cache: ResponseCache | bool | None = None,
+    ):
+        """Add a function handler suggesting the choices of an option while it is typed in.
+
+        Args:
+            option (str): Name of the option, it is flagged with `autocomplete`.
+            executor (str | None, optional): Run the callback in the app's thread pool (`thread`, sync callbacks only), on the event loop (`inline`) or in the app's process pool (`process`). Defaults to None, `thread`.
+            cache (ResponseCache | bool | None, optional): Memoize the suggestions per typed value. Defaults to None.
+
+        Raises:
+            ValueError: If the command has no such option.
+        """
+        _enable_autocomplete(self.options, option)
+
+        def _autocomplete(func: AUTOCOMPLETE_CALLBACK_FUNCTION):
+            handler = Autocomplete(option, func, executor, cache)
 
-class SlashCommand:
+            self._autocomplete[option] = handler
+            if self._on_change is not None:
+                self._on_change()
+
+            return handler
+
+        return _autocomplete
+
+
+class SlashCommand(BaseHandler):
     def __init__(
-        self, command: ApplicationCommand, callback: SLASH_CALLBACK_FUNCTION
+        self,
+        command: ApplicationCommand,
+        callback: SLASH_CALLBACK_FUNCTION,
+        on_change: Callable[[], None] | None = None,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        cache: ResponseCache | bool | None = None,
+        defer_ephemeral: bool = False,
     ) -> None:
+        super().__init__(callback, defer_after, executor, cache, defer_ephemeral)
+
         self.command = command
-        self._callback = callback
         self._command_groups: Dict[str, SlashSubgroup] = {}
         self._subcommands: Dict[str, SlashSubcommand] = {}
+        self._autocomplete: Dict[str, Autocomplete] = {}
+        self._on_change = on_change
 
     def _to_json(self):
         command_groups = [i._to_json() for _, i in self._command_groups.items()]
@@ -154,9 +370,12 @@ class SlashCommand:
         return json
 
     def command_group(self, name: str, description: str):
-        group = SlashSubgroup(name, description)
+        group = SlashSubgroup(name, description, self._on_change)
 
         self._command_groups[name] = group
+        if self._on_change is not None:
+            self._on_change()
+
         return self._command_groups[name]
 
     def subcommand(
@@ -164,48 +383,139 @@ class SlashCommand:
         name: str,
         description: str,
         options: List[ApplicationCommandOption] = None,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        cache: ResponseCache | bool | None = None,
+        defer_ephemeral: bool = False,
     ):
         def _subcommand(func: SLASH_CALLBACK_FUNCTION):
-            subcmd = SlashSubcommand(name, description, func, options)
+            subcmd = SlashSubcommand(
+                name,
+                description,
+                func,
+                options,
+                defer_after,
+                executor,
+                cache,
+                self._on_change,
+                defer_ephemeral,
+            )
 
             self._subcommands[name] = subcmd
+            if self._on_change is not None:
+                self._on_change()
+
             return self._subcommands[name]
 
         return _subcommand
 
+    def autocomplete(
+        self,
+        option: str,
+        executor: str | None = None,
+        cache: ResponseCache | bool | None = None,
+    ):
+        """Add a function handler suggesting the choices of an option while it is typed in.
+
+        Args:
+            option (str): Name of the option, it is flagged with `autocomplete`.
+            executor (str | None, optional): Run the callback in the app's thread pool (`thread`, sync callbacks only), on the event loop (`inline`) or in the app's process pool (`process`). Defaults to None, `thread`.
+            cache (ResponseCache | bool | None, optional): Memoize the suggestions per typed value. Defaults to None.
+
+        Raises:
+            ValueError: If the command has no such option.
+        """
+        _enable_autocomplete(self.command.options, option)
 
-class UserCommand:
+        def _autocomplete(func: AUTOCOMPLETE_CALLBACK_FUNCTION):
+            handler = Autocomplete(option, func, executor, cache)
+
+            self._autocomplete[option] = handler
+            if self._on_change is not None:
+                self._on_change()
+
+            return handler
+
+        return _autocomplete
+
+
+class UserCommand(BaseHandler):
     def __init__(
-        self, command: ApplicationCommand, func: USER_CALLBACK_FUNCTION
+        self,
+        command: ApplicationCommand,
+        func: USER_CALLBACK_FUNCTION,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        defer_ephemeral: bool = False,
     ) -> None:
+        super().__init__(func, defer_after, executor, defer_ephemeral=defer_ephemeral)
+
         self.command = command
-        self._callback = func
 
     def _to_json(self):
         return {"name": self.command.name, "type": self.command.type}
 
 
-class MessageCommand:
+class MessageCommand(BaseHandler):
     def __init__(
-        self, command: ApplicationCommand, func: MESSAGE_CALLBACK_FUNCTION
+        self,
+        command: ApplicationCommand,
+        func: MESSAGE_CALLBACK_FUNCTION,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        defer_ephemeral: bool = False,
     ) -> None:
+        super().__init__(func, defer_after, executor, defer_ephemeral=defer_ephemeral)
+
         self.command = command
-        self._callback = func
 
     def _to_json(self):
         return {"name": self.command.name, "type": self.command.type}
 
 
-class MessageComponent:
-    def __init__(self, custom_id: str, func: COMPONENT_CALLBACK_FUNCTION) -> None:
+class MessageComponent(BaseHandler):
+    def __init__(
+        self,
+        custom_id: str | None,
+        func: COMPONENT_CALLBACK_FUNCTION,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        cache: ResponseCache | bool | None = None,
+        state: StateCodec | None = None,
+        defer_ephemeral: bool = False,
+    ) -> None:
+        super().__init__(func, defer_after, executor, cache, defer_ephemeral)
+
+        if custom_id is None and state is not None:
+            custom_id = state.pattern
+
+        if is_pattern(custom_id):
+            parse_pattern(custom_id)  # type: ignore
+
         self.custom_id = custom_id
-        self._callback = func
+        self.state = state
+
+
+class ModalSubmit(BaseHandler):
+    def __init__(
+        self,
+        custom_id: str | None,
+        func: MODALSUBMIT_CALLBACK_FUNCTION,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        state: StateCodec | None = None,
+        defer_ephemeral: bool = False,
+    ) -> None:
+        super().__init__(func, defer_after, executor, defer_ephemeral=defer_ephemeral)
 
+        if custom_id is None and state is not None:
+            custom_id = state.pattern
+
+        if is_pattern(custom_id):
+            parse_pattern(custom_id)  # type: ignore
 
-class ModalSubmit:
-    def __init__(self, custom_id, func: MODALSUBMIT_CALLBACK_FUNCTION) -> None:
         self.custom_id = custom_id
-        self._callback = func
+        self.state = state
 
 
 class DisInter(FastAPI):
@@ -215,6 +525,18 @@ class DisInter(FastAPI):
         application_id: str | None = None,
         public_key: str | None = None,
         guilds: List[str] | None = None,
+        json_codec: str | JSONCodec | None = None,
+        typed_payloads: bool = False,
+        verify_backend: str | None = None,
+        verify_workers: int | None = None,
+        lean: bool = False,
+        defer_after: float | None = None,
+        sync_workers: int | None = None,
+        process_workers: int | None = None,
+        dedupe_size: int = 1024,
+        dedupe_ttl: float = 900,
+        ephemeral_size: int = 10000,
+        api_cache: EntityCache | bool | None = None,
     ) -> None:
         """DisInter bot library instance.
 
@@ -223,6 +545,18 @@ class DisInter(FastAPI):
             `application_id` (str | None, optional): Discord app Application ID. Defaults to `os.environ["APPLICATION_ID"]`.
             `public_key` (str | None, optional): Discord app Public Key. Defaults to `os.environ["PUBLIC_KEY"]`.
             `guilds` (List[str] | None, optional): List of Guilds to register the bot. Defaults to `None`. If `None`, bot commands will be registered as global.
+            `json_codec` (str | JSONCodec | None, optional): JSON codec for decoding interactions and encoding responses, `orjson`, `msgspec` or `json`. Defaults to the fastest one installed.
+            `typed_payloads` (bool, optional): Decode interactions into typed structs generated from `disinter.types`, in a single pass. They are read like dicts. Requires `msgspec` and Python 3.10+. Defaults to `False`.
+            `verify_backend` (str | None, optional): Ed25519 backend for request signatures, `nacl` or `cryptography`. Defaults to `None`, the first one installed.
+            `verify_workers` (int | None, optional): Verify signatures in a thread pool of this size instead of on the event loop. Defaults to `None`.
+            `lean` (bool, optional): Serve the interactions endpoint directly at the ASGI level, bypassing FastAPI routing. Other paths are still handled by FastAPI. Defaults to `False`.
+            `defer_after` (float | None, optional): Seconds to wait for a handler before answering with a deferred response. The handler keeps running and its response is delivered by editing the original response. Defaults to `None`, never defer.
+            `sync_workers` (int | None, optional): Size of the thread pool that runs sync handler callbacks. Defaults to `None`, the `ThreadPoolExecutor` default.
+            `process_workers` (int | None, optional): Size of the process pool for handlers registered with `executor="process"`. Defaults to `None`, the number of CPUs.
+            `dedupe_size` (int, optional): Number of recent interaction ids remembered to suppress duplicate deliveries. `0` disables it. Defaults to `1024`.
+            `dedupe_ttl` (float, optional): Seconds an interaction id is remembered. Defaults to `900`, the lifetime of an interaction token.
+            `ephemeral_size` (int, optional): Maximum number of handlers registered with `ephemeral_component`. Defaults to `10000`.
+            `api_cache` (EntityCache | bool | None, optional): Cache the users, channels and guilds fetched with `api` and `async_api`. `True` uses a default `EntityCache`. Defaults to `None`.
         """
 
         super().__init__()
@@ -250,192 +584,418 @@ class DisInter(FastAPI):
         self.public_key = _public_key
         self.guilds = guilds
 
-        self.api = DiscordAPI(_token, _application_id)
+        if api_cache is True:
+            api_cache = EntityCache()
+        elif api_cache is False:
+            api_cache = None
+
+        self.api = DiscordAPI(_token, _application_id, cache=api_cache)
+        self._async_api: AsyncDiscordAPI | None = None
+        self._sync_task: asyncio.Task | None = None
+        self.codec = get_codec(json_codec)
+
+        self._decode: Callable[[bytes], Any] = self.codec.loads
+        if typed_payloads:
+            from disinter.decode import make_interaction_decoder
+
+            # bodies not matching the definitions are decoded as dicts
+            self._decode = make_interaction_decoder(self.codec.loads)
+
+        self._verifier = SignatureVerifier(_public_key, verify_backend)
+        self.verify_workers = verify_workers
+        self._verify_executor: ThreadPoolExecutor | None = None
+
+        self.lean = lean
+
+        self.defer_after = defer_after
+        self._followups: Set[asyncio.Future] = set()
+
+        self.sync_workers = sync_workers
+        self._sync_executor: ThreadPoolExecutor | None = None
+        self.process_workers = process_workers
+        self._process_executor: ProcessPoolExecutor | None = None
+
+        # results of recent interactions, keyed by interaction id
+        self._interactions: TTLCache[str, asyncio.Future] | None = None
+        if dedupe_size > 0:
+            self._interactions = TTLCache(dedupe_size, dedupe_ttl)
 
         self._slash_commands: Dict[str, SlashCommand] = {}
         self._user_commands: Dict[str, UserCommand] = {}
         self._message_commands: Dict[str, MessageCommand] = {}
 
         self._button_components: Dict[str, MessageComponent] = {}
-        self._button_fallback: COMPONENT_CALLBACK_FUNCTION | None = None
+        self._button_fallback: MessageComponent | None = None
         self._selectmenu_components: Dict[str, MessageComponent] = {}
-        self._selectmenu_fallback: COMPONENT_CALLBACK_FUNCTION | None = None
+        self._selectmenu_fallback: MessageComponent | None = None
 
         self._modalsubmit_handlers: Dict[str, ModalSubmit] = {}
-        self._modalsubmit_fallback: MODALSUBMIT_CALLBACK_FUNCTION | None = None
+        self._modalsubmit_fallback: ModalSubmit | None = None
+
+        # compiled dispatch tables, rebuilt whenever a handler is registered
+        self._routes: Dict[RouteKey, Route] | None = None
+        self._component_routes: Dict[ComponentRouteKey, Route] | None = None
+        self._autocomplete_routes: Dict[AutocompleteRouteKey, Route] | None = None
+        self._pattern_routes: Dict[str, PatternTrie] | None = None
+
+        # one-off handlers registered at runtime
+        self.ephemeral_routes = EphemeralRoutes(ephemeral_size)
 
         # add custom api router for interactions
         self.add_route(
             "/", self.__route_handler, methods=["POST"], include_in_schema=False
         )
+        self.add_event_handler("startup", self._compile_routes)
+        self.add_event_handler("shutdown", self._shutdown_executors)
+        self.add_event_handler("shutdown", self._cancel_sync)
+        self.add_event_handler("shutdown", self._close_async_api)
+
+    def _invalidate_routes(self):
+        self._routes = None
+        self._component_routes = None
+        self._autocomplete_routes = None
+        self._pattern_routes = None
+
+    def _compile_routes(self):
+        """Compile the registered handlers into the flat dispatch tables."""
+
+        self._routes = build_command_table(
+            self._slash_commands,
+            self._user_commands,
+            self._message_commands,
+            slash_context=SlashContext,
+            user_context=lambda interaction, _: UserContext(interaction),
+            message_context=lambda interaction, _: MessageContext(interaction),
+            executor=self._get_sync_executor,
+            process_executor=self._get_process_executor,
+        )
+        self._autocomplete_routes = build_autocomplete_table(
+            self._slash_commands,
+            AutocompleteContext,
+            executor=self._get_sync_executor,
+            process_executor=self._get_process_executor,
+        )
+        self._component_routes = build_component_table(
+            {
+                "button": (self._button_components, self._button_fallback),
+                "selectmenu": (
+                    self._selectmenu_components,
+                    self._selectmenu_fallback,
+                ),
+                "modal": (self._modalsubmit_handlers, self._modalsubmit_fallback),
+            },
+            {
+                "button": ComponentContext,
+                "selectmenu": ComponentContext,
+                "modal": ModalSubmitContext,
+            },
+            executor=self._get_sync_executor,
+            process_executor=self._get_process_executor,
+        )
+        self._pattern_routes = build_pattern_table(self._component_routes)
+
+    def _get_sync_executor(self) -> ThreadPoolExecutor:
+        # created on first use, and again after a shutdown of the app
+        if self._sync_executor is None:
+            self._sync_executor = ThreadPoolExecutor(
+                max_workers=self.sync_workers, thread_name_prefix="disinter-handler"
+            )
+
+        return self._sync_executor
+
+    def _get_verify_executor(self) -> ThreadPoolExecutor:
+        # created on first use, and again after a shutdown of the app
+        if self._verify_executor is None:
+            self._verify_executor = ThreadPoolExecutor(
+                max_workers=self.verify_workers, thread_name_prefix="disinter-verify"
+            )
+
+        return self._verify_executor
+
+    def _get_process_executor(self) -> ProcessPoolExecutor:
+        # created on first use, only apps with `process` handlers pay for the workers
+        if self._process_executor is None:
+            # forking while the thread pools run can copy held locks into the workers
+            self._process_executor = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        return self._process_executor
+
+    def _shutdown_executors(self):
+        # the routes look the pools up on every call, the next startup gets new ones
+        if self._sync_executor is not None:
+            self._sync_executor.shutdown(wait=False)
+            self._sync_executor = None
+        if self._verify_executor is not None:
+            self._verify_executor.shutdown(wait=False)
+            self._verify_executor = None
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=False)
+            self._process_executor = None
+
+    @property
+    def async_api(self) -> AsyncDiscordAPI:
+        """Async client of the Discord API, for `async` handlers. It is created
+        on first access with the default connection pool, requires `httpx`."""
+
+        if self._async_api is None:
+            from disinter.async_api import AsyncDiscordAPI
+
+            # both clients count against the rate limits of the token, and share the cache
+            self._async_api = AsyncDiscordAPI(
+                self.token,
+                self.application_id,
+                rate_limiter=self.api.rate_limiter,
+                cache=self.api.cache,
+            )
+
+        return self._async_api
+
+    @async_api.setter
+    def async_api(self, api: AsyncDiscordAPI) -> None:
+        self._async_api = api
+
+    async def _close_async_api(self):
+        if self._async_api is not None:
+            await self._async_api.aclose()
+            self._async_api = None
+
+    @property
+    def routes(
+        self,
+    ) -> Dict[RouteKey | ComponentRouteKey | AutocompleteRouteKey, Route]:
+        """The compiled dispatch tables of the app, keyed by
+        `(command_type, name, group, subcommand)` for application commands,
+        `(kind, custom_id)` for components and modals and
+        `((command_type, name, group, subcommand), option)` for autocompletes."""
+
+        if self._routes is None:
+            self._compile_routes()
+
+        return {**self._routes, **self._component_routes, **self._autocomplete_routes}  # type: ignore
 
     async def __route_handler(self, request: Request):
         body = await request.body()
 
         # Verify request
-        signature = request.headers.get("X-Signature-Ed25519")
-        timestamp = request.headers.get("X-Signature-Timestamp")
-        if (
-            signature is None
-            or timestamp is None
-            or not verify_key(body, signature, timestamp, self.public_key)
+        if not await self._verify_request(
+            body,
+            request.headers.get("X-Signature-Ed25519"),
+            request.headers.get("X-Signature-Timestamp"),
         ):
             return Response(content="Bad request signature", status_code=401)
 
-        req = await request.json()
+        status_code, content = await self._dispatch(body)
+        return Response(
+            content=content, status_code=status_code, media_type="application/json"
+        )
+
+    async def _verify_request(
+        self, body: bytes, signature: str | None, timestamp: str | None
+    ) -> bool:
+        if signature is None or timestamp is None:
+            return False
+
+        if self.verify_workers is not None:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._get_verify_executor(),
+                self._verifier.verify,
+                body,
+                signature,
+                timestamp,
+            )
+
+        return self._verifier.verify(body, signature, timestamp)
+
+    async def _dispatch(self, body: bytes) -> Tuple[int, bytes]:
+        """Decode a verified interaction body, run its handler and encode the response.
+
+        Args:
+            body (bytes): Raw request body.
+
+        Returns:
+            Tuple[int, bytes]: Status code and the encoded JSON response.
+        """
+        req = self._decode(body)
 
         # Automatically respond to pings
         if req["type"] == InteractionType.PING:
-            return JSONResponse({"type": InteractionResponseType.PONG})
+            return 200, PONG_RESPONSE
+
+        interaction_id = req.get("id")
+        if self._interactions is None or interaction_id is None:
+            return await self._route_interaction(req)
+
+        # a retried or replayed interaction shares the result of the first one
+        seen = self._interactions.get(interaction_id)
+        if seen is not None:
+            return await asyncio.shield(seen)
+
+        result: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._interactions.set(interaction_id, result)
+
+        try:
+            response = await self._route_interaction(req)
+        except BaseException as e:
+            self._interactions.pop(interaction_id)
+            result.set_exception(e)
+            result.exception()  # retrieved, waiters get it re-raised
+            raise
+
+        result.set_result(response)
+        return response
+
+    async def _route_interaction(self, req: Dict[str, Any]) -> Tuple[int, bytes]:
+        """Find the handler of a decoded interaction and run it.
+
+        Args:
+            req (Dict[str, Any]): The interaction.
+
+        Returns:
+            Tuple[int, bytes]: Status code and the encoded JSON response.
+        """
+        if self._routes is None:
+            self._compile_routes()
+
+        cache = self.api.cache
+        if cache is not None and cache.from_interactions:
+            # the caller and resolved objects come with the interaction
+            cache.add_interaction(req)
 
         if req["type"] == InteractionType.APPLICATION_COMMAND:
             data: InteractionApplicationCommand = req
-            command_name = data["data"]["name"]
-
-            # slash commands
-            command = self._slash_commands.get(command_name)
-            if command is not None:
-                # slash command exists
-
-                if data["data"].get("options") is not None:
-                    _opt = data["data"]["options"][0]
-
-                    # check if subcommand group
-                    if _opt["type"] == ApplicationCommandOptionTypeSubCommandGroup:
-                        group = command._command_groups.get(_opt["name"])
-                        if group is not None:
-                            if len(_opt["options"]) > 0:
-                                _sub = _opt["options"][0]
-                                if (
-                                    _sub["type"]  # type: ignore
-                                    == ApplicationCommandOptionTypeSubCommand
-                                ):
-                                    subcommand = group._subcommands.get(_sub["name"])  # type: ignore
-                                    if subcommand is None:
-                                        return JSONResponse(
-                                            {"error": "Command not defined in app"},
-                                            status_code=400,
-                                        )
-
-                                    ctx = SlashContext(data, _sub["options"])  # type: ignore
-                                    json = await self._execute_handler(
-                                        ctx, subcommand._callback
-                                    )
-                                    return JSONResponse(json, status_code=200)
-
-                    # check if subcommand
-                    if _opt["type"] == ApplicationCommandOptionTypeSubCommand:
-                        subcommand = command._subcommands.get(_opt["name"])
-                        if subcommand is None:
-                            return JSONResponse(
-                                {"error": "Command not defined in app"}, status_code=400
-                            )
-
-                        ctx = SlashContext(data, _opt["options"])
-                        json = await self._execute_handler(ctx, subcommand._callback)
-                        return JSONResponse(json, status_code=200)
-
-                slash_ctx = SlashContext(data, data["data"].get("options"))
-                json = await self._execute_handler(slash_ctx, command._callback)
-                return JSONResponse(json, status_code=200)
-
-            # user commands
-            user_command = self._user_commands.get(command_name)
-            if user_command is not None:
-                # user command exists
-                user_ctx = UserContext(data)
-                json = await self._execute_handler(user_ctx, user_command._callback)
-                return JSONResponse(json, status_code=200)
-
-            # message commands
-            message_command = self._message_commands.get(command_name)
-            if message_command is not None:
-                # message command exists
-                msg_ctx = MessageContext(data)
-                json = await self._execute_handler(msg_ctx, message_command._callback)
-                return JSONResponse(json, status_code=200)
-
-            # unknown command in here
-            return JSONResponse({"error": "Unknown type"}, status_code=401)
+            key, options = command_route_key(data["data"])
 
-        if req["type"] == InteractionType.MESSAGE_COMPONENT:
-            msg_component: InteractionMessageComponent = req
+            route = self._routes.get(key)  # type: ignore
+            if route is None:
+                name = data["data"]["name"]
+                if (
+                    name in self._slash_commands
+                    or name in self._user_commands
+                    or name in self._message_commands
+                ):
+                    # the command exists, not its subcommand
+                    return 400, COMMAND_NOT_DEFINED_RESPONSE
 
-            custom_id = msg_component["data"]["custom_id"]
-            component_type = msg_component["data"]["component_type"]
-            component_context = ComponentContext(msg_component)
+                # unknown command in here
+                return 401, UNKNOWN_TYPE_RESPONSE
 
-            if component_type == ComponentTypes.Button:  # handle button component
-                btn_component = self._button_components.get(custom_id)
-                if btn_component is not None:
-                    json = await self._execute_handler(
-                        component_context, btn_component._callback
-                    )
-                    return JSONResponse(json, status_code=200)
+            return 200, await self._run_route(route, data, options)
 
-                if self._button_fallback is not None:
-                    json = await self._execute_handler(
-                        component_context, self._button_fallback
-                    )
-                    return JSONResponse(json, status_code=200)
+        if req["type"] == InteractionType.APPLICATION_COMMAND_AUTOCOMPLETE:
+            autocomplete: InteractionApplicationCommand = req
+            key, options = command_route_key(autocomplete["data"])
 
-                # no button wrapper callback set in app
-                return JSONResponse(
-                    {"error": "Component wrapper callback function not set"},
-                    status_code=500,
-                )
+            focused = next((i["name"] for i in options or [] if i.get("focused")), "")
+            route = self._autocomplete_routes.get((key, focused))  # type: ignore
+            if route is None:
+                # no autocomplete handler for the option
+                return 400, AUTOCOMPLETE_NOT_SET_RESPONSE
 
-            if component_type in [
-                ComponentTypes.StringSelect,
-                ComponentTypes.UserSelect,
-                ComponentTypes.RoleSelect,
-                ComponentTypes.MentionableSelect,
-                ComponentTypes.ChannelSelect,
-            ]:
-                # handle select menu component
-                menu_component = self._selectmenu_components.get(custom_id)
-                if menu_component is not None:
-                    json = await self._execute_handler(
-                        component_context, menu_component._callback
-                    )
-                    return JSONResponse(json, status_code=200)
+            return 200, await self._run_route(route, autocomplete, options)
 
-                if self._selectmenu_fallback is not None:
-                    json = await self._execute_handler(
-                        component_context, self._selectmenu_fallback
-                    )
-                    return JSONResponse(json, status_code=200)
+        if req["type"] == InteractionType.MESSAGE_COMPONENT:
+            msg_component: InteractionMessageComponent = req
 
-                # no select menu wrapper callback set in app
-                return JSONResponse(
-                    {"error": "Component wrapper callback function not set"},
-                    status_code=500,
-                )
+            kind = COMPONENT_ROUTE_KINDS.get(msg_component["data"]["component_type"])
+            route, params = self._component_route(
+                kind, msg_component["data"]["custom_id"]  # type: ignore
+            )
+            if route is None:
+                # no component wrapper callback set in app
+                return 500, COMPONENT_NOT_SET_RESPONSE
+
+            return await self._run_component_route(route, msg_component, params)
 
         if req["type"] == InteractionType.MODAL_SUBMIT:
             modalsubmit: InteractionModalSubmit = req
 
-            custom_id = modalsubmit["data"]["custom_id"]
-            modal_context = ModalSubmitContext(modalsubmit)
+            route, params = self._component_route(
+                "modal", modalsubmit["data"]["custom_id"]
+            )
+            if route is None:
+                # no modalsubmit handler defined set in app
+                return 500, MODALSUBMIT_NOT_SET_RESPONSE
+
+            return await self._run_component_route(route, modalsubmit, params)
 
-            modal_handler = self._modalsubmit_handlers.get(custom_id)
-            if modal_handler is not None:
-                json = await self._execute_handler(
-                    modal_context, modal_handler._callback
-                )
-                return JSONResponse(json, status_code=200)
+        return 400, UNKNOWN_TYPE_RESPONSE
 
-            if self._modalsubmit_fallback is not None:
-                json = await self._execute_handler(
-                    modal_context, self._modalsubmit_fallback
-                )
-                return JSONResponse(json, status_code=200)
+    def _component_route(
+        self, kind: str, custom_id: str
+    ) -> Tuple[Route | None, Dict[str, str] | None]:
+        """Find the route of a custom_id: its exact match, an ephemeral
+        handler, the first matching pattern or the fallback, in this order.
 
-            # no modalsubmit handler defined set in app
-            return JSONResponse(
-                {"error": "Modal submit wrapper callback function not set."},
-                status_code=500,
-            )
+        Returns:
+            Tuple[Route | None, Dict[str, str] | None]: The route and the parameters of its pattern.
+        """
+        route = self._component_routes.get((kind, custom_id))  # type: ignore
+        if route is not None:
+            return route, None
+
+        if len(self.ephemeral_routes) > 0:
+            route = self.ephemeral_routes.get((kind, custom_id))
+            if route is not None:
+                return route, None
+
+        patterns = self._pattern_routes.get(kind)  # type: ignore
+        if patterns is not None:
+            matched = patterns.match(custom_id)
+            if matched is not None:
+                return matched
+
+        return self._component_routes.get((kind, None)), None  # type: ignore
+
+    async def _run_route(
+        self,
+        route: Route,
+        interaction: Dict[str, Any],
+        options: Any,
+        state: Dict[str, Any] | None = None,
+    ) -> bytes:
+        """Build the context of the matched route and run its handler,
+        serving the response from the route's cache if it has one."""
+
+        cache_key = None
+        if route.cache is not None:
+            cache_key = route.cache.key(route.key, interaction, options)
+            cached = route.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if state is None:
+            context = route.context(interaction, options)
+        else:
+            context = route.context(interaction, options, state)
+
+        if self.api.cache is not None:
+            # lookups of users, members and roles are served from the entity cache
+            context.cache = self.api.cache
+
+        return await self._execute_handler(context, route, cache_key)
+
+    async def _run_component_route(
+        self, route: Route, interaction: Dict[str, Any], params: Dict[str, str] | None
+    ) -> Tuple[int, bytes]:
+        """Run the handler of a component or modal submit, decoding the state
+        of its custom_id first if it has a `StateCodec`.
+
+        Returns:
+            Tuple[int, bytes]: Status code and the encoded JSON response.
+        """
+        if route.state is None:
+            return 200, await self._run_route(route, interaction, params)
+
+        try:
+            state = route.state.decode(interaction["data"]["custom_id"])
+        except StateError:
+            # forged, tampered or malformed, the handler never sees it
+            return 400, INVALID_STATE_RESPONSE
+
+        return 200, await self._run_route(route, interaction, params, state)
 
     async def _execute_handler(
         self,
@@ -444,74 +1004,290 @@ class DisInter(FastAPI):
         | MessageContext
         | ComponentContext
         | ModalSubmitContext,
-        callback: SLASH_CALLBACK_FUNCTION
-        | USER_CALLBACK_FUNCTION
-        | MESSAGE_CALLBACK_FUNCTION
-        | COMPONENT_CALLBACK_FUNCTION
-        | MODALSUBMIT_CALLBACK_FUNCTION,
+        route: Route,
+        cache_key: Hashable | None = None,
+    ) -> bytes:
+        defer_after = route.defer_after
+        if defer_after is None and route.deferred_type is not None:
+            defer_after = self.defer_after
+
+        if defer_after is None:
+            output = await route.invoke(context)
+        else:
+            task = asyncio.ensure_future(route.invoke(context))
+            done, _ = await asyncio.wait({task}, timeout=defer_after)
+            if not done:
+                # answer in time, the result is delivered to the original response later
+                followup = asyncio.ensure_future(
+                    self._deliver_followup(
+                        task, context.interaction["token"], route, cache_key
+                    )
+                )
+                self._followups.add(followup)
+                followup.add_done_callback(self._followups.discard)
+
+                return self.codec.dumps(route.deferred_response)
+
+            output = task.result()
+
+        content = self._encode_response(output)
+        if cache_key is not None:
+            route.cache.set(cache_key, content)  # type: ignore
+
+        return content
+
+    def _encode_response(self, output: HANDLER_RESPONSE) -> bytes:
+        if isinstance(output, ResponseTemplate):
+            # encoded when the template was frozen
+            return output.encoded
+
+        assert isinstance(output, DiscordResponse)
+        return self.codec.dumps(output._to_json())
+
+    async def _deliver_followup(
+        self,
+        task: asyncio.Future,
+        token: str,
+        route: Route,
+        cache_key: Hashable | None = None,
     ):
-        output = None
+        """Wait for a deferred handler and edit the original response with its output."""
+
+        try:
+            output = await task
+
+            if cache_key is not None:
+                # later calls are answered right away with the full response
+                route.cache.set(cache_key, self._encode_response(output))  # type: ignore
+
+            json = output._to_json()
+            if json["type"] == InteractionCallback.Modal:
+                # a modal is only accepted as the first response of an interaction
+                logger.error(
+                    "deferred handler of %r returned a modal, it cannot be sent after a deferral",
+                    route.key,
+                )
+                return
+
+            if "data" not in json:
+                logger.warning(
+                    "deferred handler returned a response without message data, nothing to deliver"
+                )
+                return
+
+            if self._async_api is not None:
+                await self._async_api.edit_original_interaction_response(
+                    token, json["data"]
+                )
+            else:
+                await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    self.api.edit_original_interaction_response,
+                    token,
+                    json["data"],
+                )
+        except Exception:
+            logger.exception("failed to deliver the response of a deferred handler")
+
+    def ephemeral_component(
+        self,
+        callback: COMPONENT_CALLBACK_FUNCTION | MODALSUBMIT_CALLBACK_FUNCTION,
+        kind: str = "button",
+        ttl: float = 900,
+        max_uses: int | None = 1,
+        custom_id: str | None = None,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        defer_ephemeral: bool = False,
+    ) -> str:
+        """Register a one-off handler, like the "Confirm" button of a single invocation.
+        It is removed after `ttl` seconds or `max_uses` interactions, and only lives in this process.
 
-        if asyncio.iscoroutinefunction(callback):
-            output = await callback(context)
+        Args:
+            callback (COMPONENT_CALLBACK_FUNCTION | MODALSUBMIT_CALLBACK_FUNCTION): Handler function.
+            kind (str, optional): `button`, `selectmenu` or `modal`. Defaults to `button`.
+            ttl (float, optional): Seconds the handler stays registered. Defaults to 900.
+            max_uses (int | None, optional): Interactions handled before it is removed. If None, until it expires. Defaults to 1.
+            custom_id (str | None, optional): custom_id of the component. Defaults to None, a random one.
+            defer_after (float | None, optional): Seconds before the response is deferred. Defaults to None, the app's `defer_after`.
+            executor (str | None, optional): Run the callback in the app's thread pool (`thread`, sync callbacks only), on the event loop (`inline`) or in the app's process pool (`process`). Defaults to None, `thread`.
+            defer_ephemeral (bool, optional): Defer with an ephemeral response, so that the delivered response is only seen by the user. Defaults to False.
+
+        Raises:
+            ValueError: If the kind is unknown.
+
+        Returns:
+            str: The custom_id to set on the component.
+        """
+        if kind not in DEFERRED_RESPONSE_TYPES:
+            raise ValueError(
+                f"Unknown kind {kind!r}, expected one of {list(DEFERRED_RESPONSE_TYPES)}"
+            )
+
+        if custom_id is None:
+            custom_id = f"ephemeral:{secrets.token_urlsafe(16)}"
+
+        handler: MessageComponent | ModalSubmit
+        if kind == "modal":
+            handler = ModalSubmit(
+                custom_id,
+                callback,
+                defer_after,
+                executor,
+                defer_ephemeral=defer_ephemeral,
+            )
+            context: Callable[..., Any] = ModalSubmitContext
         else:
-            output = callback(context)  # type: ignore
+            handler = MessageComponent(
+                custom_id,
+                callback,
+                defer_after,
+                executor,
+                defer_ephemeral=defer_ephemeral,
+            )
+            context = ComponentContext
+
+        route = Route(
+            (kind, custom_id),
+            handler,
+            context,
+            DEFERRED_RESPONSE_TYPES[kind],
+            self._get_sync_executor,
+            self._get_process_executor,
+        )
+        self.ephemeral_routes.add(route, ttl, max_uses)
 
-        assert isinstance(output, DiscordResponse)
+        return custom_id
 
-        return output._to_json()  # type: ignore
+    def remove_ephemeral_component(self, custom_id: str, kind: str = "button") -> bool:
+        """Remove a handler registered with `ephemeral_component`.
 
-    def modalsubmit_handler(self, custom_id: str | None = None):
+        Args:
+            custom_id (str): custom_id of the component.
+            kind (str, optional): `button`, `selectmenu` or `modal`. Defaults to `button`.
+
+        Returns:
+            bool: True if the handler was registered.
+        """
+        return self.ephemeral_routes.remove((kind, custom_id))
+
+    def modalsubmit_handler(
+        self,
+        custom_id: str | None = None,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        state: StateCodec | None = None,
+        defer_ephemeral: bool = False,
+    ):
         """Add a function handler to a modal component when submitted.
 
         Args:
-            custom_id (str | None, optional): ID of the modal. Defaults to None.
+            custom_id (str | None, optional): ID of the modal, or a pattern like `form:{user_id}` whose parameters are set on `ctx.params`. Defaults to None.
+            defer_after (float | None, optional): Seconds before the response is deferred. Defaults to None, the app's `defer_after`.
+            executor (str | None, optional): Run the callback in the app's thread pool (`thread`, sync callbacks only), on the event loop (`inline`) or in the app's process pool (`process`). Defaults to None, `thread`.
+            state (StateCodec | None, optional): Codec of the state packed into the custom_id, decoded on `ctx.state` before the handler runs. If `custom_id` is None, routes the codec's pattern. Defaults to None.
+            defer_ephemeral (bool, optional): Defer with an ephemeral response, so that the delivered response is only seen by the user. Defaults to False.
         """
 
         def _modalsubmit(func: MODALSUBMIT_CALLBACK_FUNCTION):
-            if custom_id is None:
-                self._modalsubmit_fallback = func
-                return
+            modalsub = ModalSubmit(
+                custom_id=custom_id,
+                func=func,
+                defer_after=defer_after,
+                executor=executor,
+                state=state,
+                defer_ephemeral=defer_ephemeral,
+            )
+            self._invalidate_routes()
+
+            if modalsub.custom_id is None:
+                self._modalsubmit_fallback = modalsub
+                return modalsub
 
-            modalsub = ModalSubmit(custom_id=custom_id, func=func)
-            self._modalsubmit_handlers[custom_id] = modalsub
-            return self._modalsubmit_handlers[custom_id]
+            self._modalsubmit_handlers[modalsub.custom_id] = modalsub
+            return self._modalsubmit_handlers[modalsub.custom_id]
 
         return _modalsubmit
 
-    def button_component(self, custom_id: str | None = None):
+    def button_component(
+        self,
+        custom_id: str | None = None,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        cache: ResponseCache | bool | None = None,
+        state: StateCodec | None = None,
+        defer_ephemeral: bool = False,
+    ):
         """Add a function callback to the custom_id of a button component.
 
         Args:
-            custom_id (str): ID of the button.
+            custom_id (str): ID of the button, or a pattern like `vote:{poll_id}:{choice}` whose parameters are set on `ctx.params`.
+            defer_after (float | None, optional): Seconds before the response is deferred. Defaults to None, the app's `defer_after`.
+            executor (str | None, optional): Run the callback in the app's thread pool (`thread`, sync callbacks only), on the event loop (`inline`) or in the app's process pool (`process`). Defaults to None, `thread`.
+            cache (ResponseCache | bool | None, optional): Memoize the encoded responses, keyed by custom_id and values. `True` uses a default `ResponseCache`. Defaults to None.
+            state (StateCodec | None, optional): Codec of the state packed into the custom_id, decoded on `ctx.state` before the handler runs. If `custom_id` is None, routes the codec's pattern. Defaults to None.
+            defer_ephemeral (bool, optional): Defer with an ephemeral response, so that the delivered response is only seen by the user. Defaults to False.
         """
 
         def _component(func: COMPONENT_CALLBACK_FUNCTION):
-            if custom_id is None:
-                self._button_fallback = func
-                return
+            cmp = MessageComponent(
+                custom_id=custom_id,
+                func=func,
+                defer_after=defer_after,
+                executor=executor,
+                cache=cache,
+                state=state,
+                defer_ephemeral=defer_ephemeral,
+            )
+            self._invalidate_routes()
 
-            cmp = MessageComponent(custom_id=custom_id, func=func)
-            self._button_components[custom_id] = cmp
-            return self._button_components[custom_id]
+            if cmp.custom_id is None:
+                self._button_fallback = cmp
+                return cmp
+
+            self._button_components[cmp.custom_id] = cmp
+            return self._button_components[cmp.custom_id]
 
         return _component
 
-    def selectmenu_component(self, custom_id: str | None = None):
+    def selectmenu_component(
+        self,
+        custom_id: str | None = None,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        cache: ResponseCache | bool | None = None,
+        state: StateCodec | None = None,
+        defer_ephemeral: bool = False,
+    ):
         """Add a function callback to the custom_id of a select menu component.
 
         Args:
-            custom_id (str): ID of the select menu.
+            custom_id (str): ID of the select menu, or a pattern like `role:{guild_id}` whose parameters are set on `ctx.params`.
+            defer_after (float | None, optional): Seconds before the response is deferred. Defaults to None, the app's `defer_after`.
+            executor (str | None, optional): Run the callback in the app's thread pool (`thread`, sync callbacks only), on the event loop (`inline`) or in the app's process pool (`process`). Defaults to None, `thread`.
+            cache (ResponseCache | bool | None, optional): Memoize the encoded responses, keyed by custom_id and values. `True` uses a default `ResponseCache`. Defaults to None.
+            state (StateCodec | None, optional): Codec of the state packed into the custom_id, decoded on `ctx.state` before the handler runs. If `custom_id` is None, routes the codec's pattern. Defaults to None.
+            defer_ephemeral (bool, optional): Defer with an ephemeral response, so that the delivered response is only seen by the user. Defaults to False.
         """
 
         def _component(func: COMPONENT_CALLBACK_FUNCTION):
-            if custom_id is None:
-                self._selectmenu_fallback = func
-                return
+            cmp = MessageComponent(
+                custom_id=custom_id,
+                func=func,
+                defer_after=defer_after,
+                executor=executor,
+                cache=cache,
+                state=state,
+                defer_ephemeral=defer_ephemeral,
+            )
+            self._invalidate_routes()
+
+            if cmp.custom_id is None:
+                self._selectmenu_fallback = cmp
+                return cmp
 
-            cmp = MessageComponent(custom_id=custom_id, func=func)
-            self._selectmenu_components[custom_id] = cmp
-            return self._selectmenu_components[custom_id]
+            self._selectmenu_components[cmp.custom_id] = cmp
+            return self._selectmenu_components[cmp.custom_id]
 
         return _component
 
@@ -524,6 +1300,10 @@ class DisInter(FastAPI):
         options: List[ApplicationCommandOption] = None,
         default_member_permissions: str = None,
         dm_permission: bool = None,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        cache: ResponseCache | bool | None = None,
+        defer_ephemeral: bool = False,
     ):
         """Add a new slash command.
 
@@ -535,6 +1315,10 @@ class DisInter(FastAPI):
             options (List[ApplicationCommandOption], optional): Slash command options. Defaults to None.
             default_member_permissions (str, optional): Set of permissions for the command. Defaults to None.
             dm_permission (bool, optional): Allow command in DMs. Defaults to None.
+            defer_after (float | None, optional): Seconds before the response is deferred. Defaults to None, the app's `defer_after`.
+            executor (str | None, optional): Run the callback in the app's thread pool (`thread`, sync callbacks only), on the event loop (`inline`) or in the app's process pool (`process`). Defaults to None, `thread`.
+            cache (ResponseCache | bool | None, optional): Memoize the encoded responses, keyed by command path and option values. `True` uses a default `ResponseCache`. Defaults to None.
+            defer_ephemeral (bool, optional): Defer with an ephemeral response, so that the delivered response is only seen by the user. Defaults to False.
         """
 
         def _command(func: SLASH_CALLBACK_FUNCTION):
@@ -549,35 +1333,71 @@ class DisInter(FastAPI):
                 default_member_permissions=default_member_permissions,
                 dm_permission=dm_permission,
             )
-            self._slash_commands[name] = SlashCommand(cmd, func)
+            self._slash_commands[name] = SlashCommand(
+                cmd,
+                func,
+                on_change=self._invalidate_routes,
+                defer_after=defer_after,
+                executor=executor,
+                cache=cache,
+                defer_ephemeral=defer_ephemeral,
+            )
+            self._invalidate_routes()
+
             return self._slash_commands[name]
 
         return _command
 
-    def user_command(self, name: str):
+    def user_command(
+        self,
+        name: str,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        defer_ephemeral: bool = False,
+    ):
         """Add a new user command.
 
         Args:
             name (str): Name of the user command.
+            defer_after (float | None, optional): Seconds before the response is deferred. Defaults to None, the app's `defer_after`.
+            executor (str | None, optional): Run the callback in the app's thread pool (`thread`, sync callbacks only), on the event loop (`inline`) or in the app's process pool (`process`). Defaults to None, `thread`.
+            defer_ephemeral (bool, optional): Defer with an ephemeral response, so that the delivered response is only seen by the user. Defaults to False.
         """
 
         def _command(func: USER_CALLBACK_FUNCTION):
             cmd = ApplicationCommand(name=name, type=ApplicationCommandTypeUser)
-            self._user_commands[name] = UserCommand(cmd, func)
+            self._user_commands[name] = UserCommand(
+                cmd, func, defer_after, executor, defer_ephemeral
+            )
+            self._invalidate_routes()
+
             return self._user_commands[name]
 
         return _command
 
-    def message_command(self, name: str):
+    def message_command(
+        self,
+        name: str,
+        defer_after: float | None = None,
+        executor: str | None = None,
+        defer_ephemeral: bool = False,
+    ):
         """Add a new message command.
 
         Args:
             name (str): Name of the message command.
+            defer_after (float | None, optional): Seconds before the response is deferred. Defaults to None, the app's `defer_after`.
+            executor (str | None, optional): Run the callback in the app's thread pool (`thread`, sync callbacks only), on the event loop (`inline`) or in the app's process pool (`process`). Defaults to None, `thread`.
+            defer_ephemeral (bool, optional): Defer with an ephemeral response, so that the delivered response is only seen by the user. Defaults to False.
         """
 
         def _command(func: MESSAGE_CALLBACK_FUNCTION):
             cmd = ApplicationCommand(name=name, type=ApplicationCommandTypeMessage)
-            self._message_commands[name] = MessageCommand(cmd, func)
+            self._message_commands[name] = MessageCommand(
+                cmd, func, defer_after, executor, defer_ephemeral
+            )
+            self._invalidate_routes()
+
             return self._message_commands[name]
 
         return _command
@@ -615,42 +1435,252 @@ class DisInter(FastAPI):
 
         return cmd_json, cmd_keys
 
-    def sync_commands(self):
+    def sync_commands(
+        self,
+        hash_file: str | None = None,
+        compare_remote: bool = True,
+        dry_run: bool = False,
+        concurrency: int = 8,
+        progress: SyncProgress | None = None,
+    ) -> List[SyncPlan]:
         """
         Sync commands to the set guilds in the app.
 
         If `self.guilds` is `None`, it will register the defined app commands as global commands.
 
         Note: `None != []`
+
+        Registrations whose commands did not change are skipped, the others are
+        replaced with a single bulk overwrite, which also removes the stale commands.
+        Guilds are synced concurrently, their requests wait for their rate limit buckets.
+        A guild that fails does not stop the others, its plan is `failed`.
+
+        Args:
+            hash_file (str | None, optional): File that persists the hash of the last synced commands. If it matches, no request is made. Defaults to None.
+            compare_remote (bool, optional): Get the registered commands and skip the overwrite if they match. Defaults to True.
+            dry_run (bool, optional): Only plan, the returned plans are logged and nothing is changed, neither the registrations nor the hash file. Defaults to False.
+            concurrency (int, optional): Guilds synced at the same time. Defaults to 8.
+            progress (SyncProgress | None, optional): Called with each plan once done, the number done and the total, from the worker threads. Defaults to None.
+
+        Returns:
+            List[SyncPlan]: The plan of each registration.
+        """
+        commands, _ = self._parse_commands()
+        digest = command_hash(commands)
+        hashes = load_hashes(hash_file) if hash_file is not None else {}
+
+        scopes: List[str | None] = [None] if self.guilds is None else self.guilds
+        lock = threading.Lock()
+        done = 0
+
+        def sync(guild: str | None) -> SyncPlan:
+            nonlocal done
+
+            key = self._sync_key(guild)
+            try:
+                registered = None
+                if compare_remote and hashes.get(key) != digest:
+                    registered = self.api.get_application_commands(guild)
+
+                plan = plan_sync(guild, commands, digest, hashes.get(key), registered)
+                if plan.action == SyncPlan.Overwrite and not dry_run:
+                    self.api.bulk_overwrite_application_commands(commands, guild)
+            except Exception as e:
+                plan = SyncPlan.failed(guild, len(commands), digest, e)
+
+            with lock:
+                done += 1
+                self._synced(plan, hashes, dry_run, progress, done, len(scopes))
+            return plan
+
+        if len(scopes) <= 1 or concurrency <= 1:
+            plans = [sync(i) for i in scopes]
+        else:
+            with ThreadPoolExecutor(
+                min(concurrency, len(scopes)), thread_name_prefix="disinter-sync"
+            ) as pool:
+                plans = list(pool.map(sync, scopes))
+
+        if hash_file is not None and not dry_run:
+            save_hashes(hash_file, hashes)
+
+        return plans
+
+    async def sync_commands_async(
+        self,
+        hash_file: str | None = None,
+        compare_remote: bool = True,
+        dry_run: bool = False,
+        concurrency: int = 8,
+        progress: SyncProgress | None = None,
+    ) -> List[SyncPlan]:
+        """`sync_commands` with `async_api`, without blocking the event loop.
+
+        Args:
+            hash_file (str | None, optional): File that persists the hash of the last synced commands. If it matches, no request is made. Defaults to None.
+            compare_remote (bool, optional): Get the registered commands and skip the overwrite if they match. Defaults to True.
+            dry_run (bool, optional): Only plan, the returned plans are logged and nothing is changed, neither the registrations nor the hash file. Defaults to False.
+            concurrency (int, optional): Guilds synced at the same time. Defaults to 8.
+            progress (SyncProgress | None, optional): Called with each plan once done, the number done and the total, on the event loop. Defaults to None.
+
+        Returns:
+            List[SyncPlan]: The plan of each registration.
         """
-        commands, cmd_keys = self._parse_commands()
+        commands, _ = self._parse_commands()
+        digest = command_hash(commands)
+        hashes = (
+            await asyncio.to_thread(load_hashes, hash_file)
+            if hash_file is not None
+            else {}
+        )
+
+        scopes: List[str | None] = [None] if self.guilds is None else self.guilds
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        api = self.async_api
+        done = 0
+
+        async def sync(guild: str | None) -> SyncPlan:
+            nonlocal done
+
+            key = self._sync_key(guild)
+            async with semaphore:
+                try:
+                    registered = None
+                    if compare_remote and hashes.get(key) != digest:
+                        registered = await api.get_application_commands(guild)
+
+                    plan = plan_sync(
+                        guild, commands, digest, hashes.get(key), registered
+                    )
+                    if plan.action == SyncPlan.Overwrite and not dry_run:
+                        await api.bulk_overwrite_application_commands(commands, guild)
+                except Exception as e:
+                    plan = SyncPlan.failed(guild, len(commands), digest, e)
+
+            done += 1
+            self._synced(plan, hashes, dry_run, progress, done, len(scopes))
+            return plan
+
+        plans = await asyncio.gather(*(sync(i) for i in scopes))
 
-        if self.guilds is None:
-            # global commans
-            global_commands = self.api.get_application_commands()
-            for i in global_commands:
-                # check if command exist in current new ones
-                if i["name"] in cmd_keys:
-                    continue
+        if hash_file is not None and not dry_run:
+            await asyncio.to_thread(save_hashes, hash_file, hashes)
 
-                # remove if it does not exist
-                self.api.delete_application_command(i["id"])
+        return list(plans)
 
-            # overwrite commands
-            self.api.bulk_overwrite_application_commands(commands)
+    def sync_commands_in_background(self, **kwargs) -> asyncio.Task:
+        """Run `sync_commands_async` as a task, so that a `startup` handler
+        does not wait for it before the app serves requests.
+        It must be called from the event loop, failures are logged.
 
-        for i in self.guilds:
-            guild_commands = self.api.get_application_commands(i)
-            for k in guild_commands:
-                # check if command exists in current new ones
-                if k["name"] in cmd_keys:
-                    continue
+        Args:
+            **kwargs: Arguments of `sync_commands_async`.
+
+        Returns:
+            asyncio.Task: The task, its result is the list of plans.
+        """
+        task = asyncio.ensure_future(self.sync_commands_async(**kwargs))
+        task.add_done_callback(self._sync_done)
+        self._sync_task = task
+
+        return task
+
+    def _sync_done(self, task: asyncio.Task) -> None:
+        if task.cancelled():
+            return
+
+        error = task.exception()
+        if error is not None:
+            logger.error("command sync failed", exc_info=error)
+            return
+
+        failed = [i for i in task.result() if i.action == SyncPlan.Failed]
+        logger.info(
+            "synced commands of %d registrations, %d failed",
+            len(task.result()),
+            len(failed),
+        )
+
+    async def _cancel_sync(self):
+        if self._sync_task is not None and not self._sync_task.done():
+            self._sync_task.cancel()
 
-                # remove if it does not exist
-                self.api.delete_application_command(k["id"], i)
+    def _sync_key(self, guild: str | None) -> str:
+        return f"{self.application_id}:{'global' if guild is None else guild}"
+
+    def _synced(
+        self,
+        plan: SyncPlan,
+        hashes: Dict[str, str],
+        dry_run: bool,
+        progress: SyncProgress | None,
+        done: int,
+        total: int,
+    ) -> None:
+        if dry_run:
+            logger.info("dry run, %s", plan)
+        elif plan.action == SyncPlan.Failed:
+            logger.warning("failed to sync the commands, %s", plan)
+        else:
+            hashes[self._sync_key(plan.guild)] = plan.hash
 
-            # overwrite commands
-            self.api.bulk_overwrite_application_commands(commands, i)
+        if progress is not None:
+            progress(plan, done, total)
+
+    async def _asgi_interaction(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """Handle a request to the interactions endpoint without going through
+        the FastAPI router, request and response objects."""
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        signature: str | None = None
+        timestamp: str | None = None
+        for name, value in scope["headers"]:
+            if name == b"x-signature-ed25519":
+                signature = value.decode("latin-1")
+            elif name == b"x-signature-timestamp":
+                timestamp = value.decode("latin-1")
+
+        if not await self._verify_request(body, signature, timestamp):
+            status_code, content, content_type = (
+                401,
+                b"Bad request signature",
+                b"text/plain; charset=utf-8",
+            )
+        elif b'"data"' not in body and PING_PATTERN.search(body) is not None:
+            # only pings come without interaction data, answer without decoding
+            status_code, content, content_type = 200, PONG_RESPONSE, b"application/json"
+        else:
+            status_code, content = await self._dispatch(body)
+            content_type = b"application/json"
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status_code,
+                "headers": [
+                    (b"content-type", content_type),
+                    (b"content-length", str(len(content)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": content})
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            self.lean
+            and scope["type"] == "http"
+            and scope["method"] == "POST"
+            and scope["path"] == "/"
+        ):
+            await self._asgi_interaction(scope, receive, send)
+            return
+
         await super().__call__(scope, receive, send)
@@ -0,0 +1,728 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import importlib
+import itertools
+import re
+import threading
+import time
+from concurrent.futures import Executor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from disinter.cache import ResponseCache
+from disinter.command import (
+    ApplicationCommandOptionTypeSubCommand,
+    ApplicationCommandOptionTypeSubCommandGroup,
+    ApplicationCommandTypeSlashCommand,
+)
+from disinter.response import InteractionCallback
+from disinter.types import ApplicationCommandData, ComponentTypes, InteractionDataOption
+
+if TYPE_CHECKING:
+    from disinter.state import StateCodec
+
+# (command_type, name, group, subcommand)
+RouteKey = Tuple[int, str, Optional[str], Optional[str]]
+
+# (kind, custom_id), custom_id is None for the fallback handler
+ComponentRouteKey = Tuple[str, Optional[str]]
+
+# (command route key, focused option name)
+AutocompleteRouteKey = Tuple[RouteKey, str]
+
+# route kind of each message component type
+COMPONENT_ROUTE_KINDS: Dict[int, str] = {
+    ComponentTypes.Button: "button",
+    ComponentTypes.StringSelect: "selectmenu",
+    ComponentTypes.UserSelect: "selectmenu",
+    ComponentTypes.RoleSelect: "selectmenu",
+    ComponentTypes.MentionableSelect: "selectmenu",
+    ComponentTypes.ChannelSelect: "selectmenu",
+}
+
+Invoker = Callable[[Any], Awaitable[Any]]
+
+# `EPHEMERAL` message flag, the message is only seen by the user
+EPHEMERAL_FLAG = 1 << 6
+
+# `{name}` parameters of a custom_id pattern
+PATTERN_PARAM = re.compile(r"\{([^{}]*)\}")
+
+
+# response type sent when the handler of a route kind is deferred
+DEFERRED_RESPONSE_TYPES: Dict[str, int] = {
+    "button": InteractionCallback.DefferedUpdateMessage,
+    "selectmenu": InteractionCallback.DefferedUpdateMessage,
+    "modal": InteractionCallback.DeferredChannelMessageWithSource,
+}
+
+
+class Route:
+    def __init__(
+        self,
+        key: RouteKey | ComponentRouteKey | AutocompleteRouteKey,
+        handler: Any,
+        context: Callable[..., Any],
+        deferred_type: int
+        | None = InteractionCallback.DeferredChannelMessageWithSource,
+        executor: Callable[[], Executor] | None = None,
+        process_executor: Callable[[], Executor] | None = None,
+    ) -> None:
+        """A compiled entry of the dispatch table.
+
+        Args:
+            key (RouteKey | ComponentRouteKey | AutocompleteRouteKey): Key of the route in the table.
+            handler (Any): The registered handler.
+            context (Callable[..., Any]): Builds the handler context from the interaction and its options.
+            deferred_type (int | None, optional): Response type sent if the handler is deferred. If None, it is never deferred. Defaults to `DeferredChannelMessageWithSource`.
+            executor (Callable[[], Executor] | None, optional): Returns the pool for sync callbacks. If None, they run inline. Defaults to None.
+            process_executor (Callable[[], Executor] | None, optional): Returns the process pool for `process` handlers. Defaults to None.
+        """
+        self.key = key
+        self.handler = handler
+        self.callback = handler._callback
+        self.context = context
+        self.defer_after: float | None = handler.defer_after
+        self.cache: ResponseCache | None = handler.cache
+        self.deferred_type = deferred_type
+
+        # sent if the handler is deferred, the edited response keeps its flags
+        self.deferred_response: Dict[str, Any] = {"type": deferred_type}
+        if handler.defer_ephemeral and deferred_type is not None:
+            # a deferred update of a component's message cannot be ephemeral, it
+            # is deferred as a new message that the response is delivered to
+            self.deferred_response = {
+                "type": InteractionCallback.DeferredChannelMessageWithSource,
+                "data": {"flags": EPHEMERAL_FLAG},
+            }
+
+        # codec of the state packed into the custom_id, decoded before the handler runs
+        self.state: StateCodec | None = getattr(handler, "state", None)
+
+        if handler.executor == "process":
+            if process_executor is None:
+                raise ValueError(f"No process pool for the handler of route {key!r}")
+
+            self.invoke = make_process_invoker(self.callback, process_executor)
+        else:
+            self.invoke = make_invoker(
+                self.callback, None if handler.executor == "inline" else executor
+            )
+
+    def __repr__(self) -> str:
+        return f"<Route {self.key!r} -> {getattr(self.callback, '__qualname__', self.callback)}>"
+
+
+def make_invoker(
+    callback: Callable[..., Any], executor: Callable[[], Executor] | None = None
+) -> Invoker:
+    """Resolve once whether the callback is a coroutine function and return
+    an awaitable invoker for it.
+
+    Args:
+        callback (Callable[..., Any]): Handler function.
+        executor (Callable[[], Executor] | None, optional): Returns the pool to run a sync callback in, looked up on every call. If None, it runs inline on the event loop. Defaults to None.
+
+    Returns:
+        Invoker: Coroutine function that calls the handler with a context.
+    """
+    if asyncio.iscoroutinefunction(callback):
+        return callback
+
+    if executor is None:
+
+        async def _invoke_inline(context: Any):
+            return callback(context)
+
+        return _invoke_inline
+
+    async def _invoke(context: Any):
+        return await asyncio.get_running_loop().run_in_executor(
+            executor(), callback, context
+        )
+
+    return _invoke
+
+
+def check_process_callback(callback: Callable[..., Any]) -> Tuple[str, str]:
+    """Check that a worker process can import a callback by its module and qualified name.
+
+    Args:
+        callback (Callable[..., Any]): Handler function.
+
+    Raises:
+        ValueError: If the callback is a lambda or a function defined in another function.
+
+    Returns:
+        Tuple[str, str]: Module and qualified name of the callback.
+    """
+    ref = (callback.__module__, callback.__qualname__)
+    if "<locals>" in ref[1] or "<lambda>" in ref[1]:
+        raise ValueError(
+            f"{ref[1]!r} must be a module level function to run in a process pool"
+        )
+
+    return ref
+
+
+def make_process_invoker(
+    callback: Callable[..., Any], executor: Callable[[], Executor]
+) -> Invoker:
+    """Return an invoker that runs the callback in a worker process.
+    The context is pickled to the worker and the response is pickled back.
+
+    Args:
+        callback (Callable[..., Any]): Module level handler function.
+        executor (Callable[[], Executor]): Returns the process pool.
+
+    Raises:
+        ValueError: If the callback cannot be imported by a worker process.
+
+    Returns:
+        Invoker: Coroutine function that calls the handler with a context.
+    """
+    ref = check_process_callback(callback)
+
+    async def _invoke(context: Any):
+        return await asyncio.get_running_loop().run_in_executor(
+            executor(), call_in_process, ref, context
+        )
+
+    return _invoke
+
+
+# callbacks resolved in this worker process, keyed by (module, qualname)
+_process_callbacks: Dict[Tuple[str, str], Callable[..., Any]] = {}
+
+
+def call_in_process(ref: Tuple[str, str], context: Any) -> Any:
+    """Entry point of the process pool workers. Resolves the handler callback
+    by its module and qualified name and calls it with the context."""
+
+    callback = _process_callbacks.get(ref)
+    if callback is None:
+        module, qualname = ref
+
+        target: Any = importlib.import_module(module)
+        for attr in qualname.split("."):
+            target = getattr(target, attr)
+
+        # the decorators replace the function with its registered handler
+        callback = getattr(target, "_callback", target)
+        _process_callbacks[ref] = callback
+
+    if asyncio.iscoroutinefunction(callback):
+        return asyncio.run(callback(context))
+
+    return callback(context)
+
+
+def command_route_key(
+    data: ApplicationCommandData,
+) -> Tuple[RouteKey, List[InteractionDataOption] | None]:
+    """Get the route key and the handler options of an application command data.
+
+    Args:
+        data (ApplicationCommandData): The `data` of the interaction.
+
+    Returns:
+        Tuple[RouteKey, List[InteractionDataOption] | None]: Route key and the options for the context.
+    """
+    command_type = data.get("type", ApplicationCommandTypeSlashCommand)
+    options = data.get("options")
+
+    group: str | None = None
+    subcommand: str | None = None
+
+    if options:
+        opt = options[0]
+
+        if opt["type"] == ApplicationCommandOptionTypeSubCommandGroup:
+            group = opt["name"]
+            opt = opt["options"][0]  # type: ignore
+
+        if opt["type"] == ApplicationCommandOptionTypeSubCommand:
+            subcommand = opt["name"]
+            options = opt.get("options")
+
+    return (command_type, data["name"], group, subcommand), options
+
+
+def build_command_table(
+    slash_commands: Dict[str, Any],
+    user_commands: Dict[str, Any],
+    message_commands: Dict[str, Any],
+    slash_context: Callable[..., Any],
+    user_context: Callable[..., Any],
+    message_context: Callable[..., Any],
+    executor: Callable[[], Executor] | None = None,
+    process_executor: Callable[[], Executor] | None = None,
+) -> Dict[RouteKey, Route]:
+    """Flatten the registered application commands into a routing table.
+
+    Returns:
+        Dict[RouteKey, Route]: Compiled routing table.
+    """
+    table: Dict[RouteKey, Route] = {}
+
+    for name, command in slash_commands.items():
+        ctype = command.command.type
+
+        key: RouteKey = (ctype, name, None, None)
+        table[key] = Route(
+            key,
+            command,
+            slash_context,
+            executor=executor,
+            process_executor=process_executor,
+        )
+
+        for sub_name, sub in command._subcommands.items():
+            key = (ctype, name, None, sub_name)
+            table[key] = Route(
+                key,
+                sub,
+                slash_context,
+                executor=executor,
+                process_executor=process_executor,
+            )
+
+        for group_name, group in command._command_groups.items():
+            for sub_name, sub in group._subcommands.items():
+                key = (ctype, name, group_name, sub_name)
+                table[key] = Route(
+                    key,
+                    sub,
+                    slash_context,
+                    executor=executor,
+                    process_executor=process_executor,
+                )
+
+    for name, command in user_commands.items():
+        key = (command.command.type, name, None, None)
+        table[key] = Route(
+            key,
+            command,
+            user_context,
+            executor=executor,
+            process_executor=process_executor,
+        )
+
+    for name, command in message_commands.items():
+        key = (command.command.type, name, None, None)
+        table[key] = Route(
+            key,
+            command,
+            message_context,
+            executor=executor,
+            process_executor=process_executor,
+        )
+
+    return table
+
+
+def build_autocomplete_table(
+    slash_commands: Dict[str, Any],
+    context: Callable[..., Any],
+    executor: Callable[[], Executor] | None = None,
+    process_executor: Callable[[], Executor] | None = None,
+) -> Dict[AutocompleteRouteKey, Route]:
+    """Flatten the autocomplete handlers of the slash commands into a routing table.
+    Autocomplete responses cannot be deferred.
+
+    Returns:
+        Dict[AutocompleteRouteKey, Route]: Compiled routing table.
+    """
+    table: Dict[AutocompleteRouteKey, Route] = {}
+
+    for name, command in slash_commands.items():
+        ctype = command.command.type
+
+        handlers: List[Tuple[RouteKey, Any]] = [((ctype, name, None, None), command)]
+        handlers.extend(
+            ((ctype, name, None, sub_name), sub)
+            for sub_name, sub in command._subcommands.items()
+        )
+        for group_name, group in command._command_groups.items():
+            handlers.extend(
+                ((ctype, name, group_name, sub_name), sub)
+                for sub_name, sub in group._subcommands.items()
+            )
+
+        for route_key, handler in handlers:
+            for option, autocomplete in handler._autocomplete.items():
+                key: AutocompleteRouteKey = (route_key, option)
+                table[key] = Route(
+                    key, autocomplete, context, None, executor, process_executor
+                )
+
+    return table
+
+
+def build_component_table(
+    handlers: Dict[str, Tuple[Dict[str, Any], Any | None]],
+    contexts: Dict[str, Callable[..., Any]],
+    executor: Callable[[], Executor] | None = None,
+    process_executor: Callable[[], Executor] | None = None,
+) -> Dict[ComponentRouteKey, Route]:
+    """Flatten the registered component and modal handlers into a routing table.
+
+    Args:
+        handlers (Dict[str, Tuple[Dict[str, Any], Any | None]]): Handlers and fallback per route kind.
+        contexts (Dict[str, Callable[..., Any]]): Context builder per route kind.
+        executor (Callable[[], Executor] | None, optional): Returns the pool for sync callbacks. Defaults to None.
+        process_executor (Callable[[], Executor] | None, optional): Returns the process pool. Defaults to None.
+
+    Returns:
+        Dict[ComponentRouteKey, Route]: Compiled routing table.
+    """
+    table: Dict[ComponentRouteKey, Route] = {}
+
+    for kind, (components, fallback) in handlers.items():
+        for custom_id, component in components.items():
+            key: ComponentRouteKey = (kind, custom_id)
+            table[key] = Route(
+                key,
+                component,
+                contexts[kind],
+                DEFERRED_RESPONSE_TYPES[kind],
+                executor,
+                process_executor,
+            )
+
+        if fallback is not None:
+            key = (kind, None)
+            table[key] = Route(
+                key,
+                fallback,
+                contexts[kind],
+                DEFERRED_RESPONSE_TYPES[kind],
+                executor,
+                process_executor,
+            )
+
+    return table
+
+
+def is_pattern(custom_id: str | None) -> bool:
+    """Check if a custom_id is a pattern with `{name}` parameters."""
+
+    return custom_id is not None and PATTERN_PARAM.search(custom_id) is not None
+
+
+def parse_pattern(pattern: str) -> List[str | None]:
+    """Split a custom_id pattern into its literal characters and its parameters (None).
+
+    Args:
+        pattern (str): The pattern, like `vote:{poll_id}:{choice}`.
+
+    Raises:
+        ValueError: If a parameter name is invalid or repeated, or two parameters are adjacent.
+
+    Returns:
+        List[str | None]
+    """
+    tokens: List[str | None] = []
+    names: List[str] = []
+
+    position = 0
+    for match in PATTERN_PARAM.finditer(pattern):
+        name = match.group(1)
+        if not name.isidentifier():
+            raise ValueError(f"Invalid parameter {name!r} in pattern {pattern!r}")
+        if name in names:
+            raise ValueError(f"Repeated parameter {name!r} in pattern {pattern!r}")
+        if match.start() == position and tokens and tokens[-1] is None:
+            raise ValueError(f"Adjacent parameters in pattern {pattern!r}")
+
+        tokens.extend(pattern[position : match.start()])
+        tokens.append(None)
+        names.append(name)
+        position = match.end()
+
+    tokens.extend(pattern[position:])
+    return tokens
+
+
+class _PatternNode:
+    __slots__ = ("children", "param", "value")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, _PatternNode] = {}
+        self.param: _PatternNode | None = None
+        self.value: Tuple[Any, List[str]] | None = None
+
+
+class PatternTrie:
+    def __init__(self) -> None:
+        """Prefix trie of custom_id patterns. Matching walks the custom_id once,
+        its cost does not depend on the number of patterns.
+
+        A parameter matches one or more characters, as few as the rest of its pattern
+        allows, or the rest of the custom_id if it is the last one.
+        Literal characters take precedence over parameters.
+        """
+        self._root = _PatternNode()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, pattern: str, value: Any) -> None:
+        """Add a pattern.
+
+        Args:
+            pattern (str): The pattern, like `vote:{poll_id}:{choice}`.
+            value (Any): Returned when a custom_id matches the pattern.
+        """
+        node = self._root
+        for token in parse_pattern(pattern):
+            if token is None:
+                if node.param is None:
+                    node.param = _PatternNode()
+                node = node.param
+            else:
+                node = node.children.setdefault(token, _PatternNode())
+
+        if node.value is None:
+            self._size += 1
+
+        node.value = (value, PATTERN_PARAM.findall(pattern))
+
+    def match(self, custom_id: str) -> Tuple[Any, Dict[str, str]] | None:
+        """Match a custom_id against the patterns.
+
+        Args:
+            custom_id (str): The custom_id.
+
+        Returns:
+            Tuple[Any, Dict[str, str]] | None: Value of the matched pattern and its parameters.
+        """
+        values: List[str] = []
+        node = _match(self._root, custom_id, 0, values)
+        if node is None:
+            return None
+
+        value, names = node.value  # type: ignore
+        return value, dict(zip(names, values))
+
+
+def _match(
+    node: _PatternNode, custom_id: str, position: int, values: List[str]
+) -> _PatternNode | None:
+    # literal characters first, a parameter only if they lead nowhere
+    end = len(custom_id)
+    while position < end:
+        child = node.children.get(custom_id[position])
+        if child is None:
+            break
+
+        if node.param is not None:
+            # both can continue, keep the parameter to backtrack to
+            found = _match(child, custom_id, position + 1, values)
+            if found is not None:
+                return found
+            break
+
+        node = child
+        position += 1
+    else:
+        if node.value is not None:
+            return node
+        # the custom_id ends here, only an empty parameter could follow
+
+    param = node.param
+    if param is None or position == end:
+        return None
+
+    # the parameter ends before a character the pattern continues with,
+    # the first such position that leads to a match wins
+    for stop in _param_ends(param, custom_id, position + 1):
+        values.append(custom_id[position:stop])
+        found = _match(param, custom_id, stop, values)
+        if found is not None:
+            return found
+
+        values.pop()
+
+    return None
+
+
+def _param_ends(node: _PatternNode, custom_id: str, start: int) -> Iterator[int]:
+    # positions of the characters the pattern continues with, then the end
+    children = node.children
+    if len(children) == 1:
+        char = next(iter(children))
+        stop = custom_id.find(char, start)
+        while stop != -1:
+            yield stop
+            stop = custom_id.find(char, stop + 1)
+    elif children:
+        for stop in range(start, len(custom_id)):
+            if custom_id[stop] in children:
+                yield stop
+
+    yield len(custom_id)
+
+
+def build_pattern_table(
+    table: Dict[ComponentRouteKey, Route]
+) -> Dict[str, PatternTrie]:
+    """Compile the custom_id patterns of a component routing table into a trie per route kind.
+
+    Args:
+        table (Dict[ComponentRouteKey, Route]): Compiled component routing table.
+
+    Returns:
+        Dict[str, PatternTrie]
+    """
+    patterns: Dict[str, PatternTrie] = {}
+
+    for (kind, custom_id), route in table.items():
+        if is_pattern(custom_id):
+            patterns.setdefault(kind, PatternTrie()).add(custom_id, route)  # type: ignore
+
+    return patterns
+
+
+class _EphemeralRoute:
+    __slots__ = ("route", "expires_at", "uses")
+
+    def __init__(self, route: Route, expires_at: float, uses: int | None) -> None:
+        self.route = route
+        self.expires_at = expires_at
+        self.uses = uses
+
+
+class EphemeralRoutes:
+    def __init__(self, maxsize: int) -> None:
+        """Component routes registered at runtime, removed once their time to live
+        is over or their uses are consumed. If full, the route closest to expiring
+        is evicted. Expiry times are kept in a heap, evictions are O(log n).
+
+        Args:
+            maxsize (int): Maximum number of routes.
+        """
+        if maxsize <= 0:
+            raise ValueError("`maxsize` must be greater than 0")
+
+        self.maxsize = maxsize
+
+        self.expirations = 0
+        self.evictions = 0
+
+        self._routes: Dict[ComponentRouteKey, _EphemeralRoute] = {}
+        # (expires_at, sequence, key, entry), entries of removed routes are skipped
+        self._expiry: List[Tuple[float, int, ComponentRouteKey, _EphemeralRoute]] = []
+        self._sequence = itertools.count()
+        # handlers running in the thread pool register routes too
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def add(self, route: Route, ttl: float, max_uses: int | None = None) -> None:
+        """Add a route, replacing the one with the same key.
+
+        Args:
+            route (Route): The route, keyed by `(kind, custom_id)`.
+            ttl (float): Seconds the route stays registered.
+            max_uses (int | None, optional): Interactions the route handles before it is removed. Defaults to None, unlimited.
+        """
+        with self._lock:
+            self._add(route, ttl, max_uses)
+
+    def _add(self, route: Route, ttl: float, max_uses: int | None) -> None:
+        now = time.monotonic()
+        self._purge(now)
+
+        key: ComponentRouteKey = route.key  # type: ignore
+        if key not in self._routes:
+            while len(self._routes) >= self.maxsize:
+                self._pop()
+                self.evictions += 1
+
+        entry = _EphemeralRoute(route, now + ttl, max_uses)
+        self._routes[key] = entry
+        heapq.heappush(
+            self._expiry, (entry.expires_at, next(self._sequence), key, entry)
+        )
+
+        # drop the entries of removed routes once they outnumber the live ones
+        if len(self._expiry) > 2 * len(self._routes) + 64:
+            self._expiry = [i for i in self._expiry if self._routes.get(i[2]) is i[3]]
+            heapq.heapify(self._expiry)
+
+    def get(self, key: ComponentRouteKey) -> Route | None:
+        """Get the route of a key and consume one of its uses.
+
+        Args:
+            key (ComponentRouteKey): `(kind, custom_id)` of the interaction.
+
+        Returns:
+            Route | None
+        """
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key: ComponentRouteKey) -> Route | None:
+        entry = self._routes.get(key)
+        if entry is None:
+            return None
+
+        if entry.expires_at < time.monotonic():
+            del self._routes[key]
+            self.expirations += 1
+            return None
+
+        if entry.uses is not None:
+            entry.uses -= 1
+            if entry.uses <= 0:
+                del self._routes[key]
+
+        return entry.route
+
+    def remove(self, key: ComponentRouteKey) -> bool:
+        """Remove the route of a key.
+
+        Returns:
+            bool: True if the route was registered.
+        """
+        with self._lock:
+            return self._routes.pop(key, None) is not None
+
+    def _pop(self) -> None:
+        # remove the live route closest to expiring
+        while self._expiry:
+            _, _, key, entry = heapq.heappop(self._expiry)
+            if self._routes.get(key) is entry:
+                del self._routes[key]
+                return
+
+    def _purge(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] < now:
+            _, _, key, entry = heapq.heappop(self._expiry)
+            if self._routes.get(key) is entry:
+                del self._routes[key]
+                self.expirations += 1
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Expiration and eviction counters and the current number of routes."""
+
+        return {
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "size": len(self._routes),
+        }
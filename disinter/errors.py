@@ -1,9 +1,10 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
 class APIError(Exception):
-    def __init__(self, error: Dict[str, Any]):
+    def __init__(self, error: Dict[str, Any], status: Optional[int] = None):
         self.error = error
+        self.status = status
 
 
 class CommandNameExists(Exception):
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, Mapping, Tuple
+
+# path segments whose id is a major parameter, with their own buckets per id
+MAJOR_PARAMETERS = ("channels", "guilds", "webhooks")
+
+# statuses retried with a jittered backoff
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# (route, major parameters) of a request, like ("GET /guilds/1/commands/{id}", "1")
+BucketRoute = Tuple[str, str]
+
+
+class _Bucket:
+    __slots__ = ("limit", "remaining", "reset_at", "period")
+
+    def __init__(self) -> None:
+        self.limit = 1
+        self.remaining = 1
+        self.reset_at = 0.0
+        self.period = 1.0
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        global_limit: int | None = 50,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ) -> None:
+        """Client side state of the Discord rate limits, shared by the requests of a bot token.
+
+        Buckets are learned from the `X-RateLimit-*` headers of the responses and
+        requests wait for their bucket to reset instead of being answered with a 429.
+        A global 429 pauses every request. 429s are retried after their `retry_after`,
+        5xx responses after an exponential backoff, both with jitter.
+
+        Args:
+            global_limit (int | None, optional): Requests per second across all routes. If None, only the global 429s are respected. Defaults to 50.
+            max_retries (int, optional): Retries of a request answered with a 429 or a 5xx. Defaults to 3.
+            backoff_base (float, optional): Seconds before the first retry of a 5xx, doubled on every retry. Defaults to 0.5.
+            backoff_max (float, optional): Longest backoff in seconds. Defaults to 30.0.
+        """
+        self.global_limit = global_limit
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.waits = 0
+        self.rate_limited = 0
+        self.retries = 0
+
+        # routes share a bucket once its hash is known, until then each has its own
+        self._routes: Dict[BucketRoute, str] = {}
+        self._buckets: Dict[str, _Bucket] = {}
+
+        # buckets of past windows are dropped once there are this many
+        self._prune_at = 1024
+
+        self._global_reset_at = 0.0
+        self._window_start = 0.0
+        self._window_count = 0
+
+        # reserved by threads of the sync client and by the event loop
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def route(method: str, endpoint: str) -> BucketRoute:
+        """Get the bucket route of a request, ids other than the major parameters are replaced.
+
+        Args:
+            method (str): Method of the request.
+            endpoint (str): Path of the request, without the query.
+
+        Returns:
+            BucketRoute
+        """
+        segments = endpoint.split("/")
+        major = []
+        for i in range(1, len(segments)):
+            previous = segments[i - 1]
+            if previous in MAJOR_PARAMETERS:
+                major.append(segments[i])
+            elif major and previous == major[-1] and segments[i - 2] == "webhooks":
+                # the interaction token of a webhook
+                major.append(segments[i])
+                segments[i] = "{token}"
+            elif segments[i].isdigit():
+                segments[i] = "{id}"
+
+        return f"{method} {'/'.join(segments)}", "/".join(major)
+
+    def _bucket_key(self, route: BucketRoute) -> str:
+        return self._routes.get(route) or f"{route[0]}:{route[1]}"
+
+    def reserve(self, route: BucketRoute) -> float:
+        """Reserve a request on the route if its bucket and the global limit allow it.
+
+        Returns:
+            float: 0 if the request can be sent now, else the seconds to wait before reserving again.
+        """
+        with self._lock:
+            now = time.monotonic()
+
+            if self._global_reset_at > now:
+                return self._global_reset_at - now
+
+            if self.global_limit is not None:
+                if now - self._window_start >= 1:
+                    self._window_start = now
+                    self._window_count = 0
+                elif self._window_count >= self.global_limit:
+                    return self._window_start + 1 - now
+
+            bucket = self._buckets.get(self._bucket_key(route))
+            if bucket is not None:
+                if bucket.reset_at <= now:
+                    # the window is over, assume it restarts with this request
+                    bucket.remaining = bucket.limit
+                    bucket.reset_at = now + bucket.period
+
+                if bucket.remaining <= 0:
+                    return bucket.reset_at - now
+
+                bucket.remaining -= 1
+
+            self._window_count += 1
+            return 0.0
+
+    def wait(self, route: BucketRoute) -> None:
+        """Block until a request on the route can be sent, and reserve it."""
+
+        while True:
+            delay = self.reserve(route)
+            if delay <= 0:
+                return
+
+            self.waits += 1
+            time.sleep(delay)
+
+    async def wait_async(self, route: BucketRoute) -> None:
+        """Wait without blocking the event loop until a request on the route can be sent, and reserve it."""
+
+        while True:
+            delay = self.reserve(route)
+            if delay <= 0:
+                return
+
+            self.waits += 1
+            await asyncio.sleep(delay)
+
+    def update(self, route: BucketRoute, headers: Mapping[str, str]) -> None:
+        """Update the bucket of the route from the `X-RateLimit-*` headers of its response."""
+
+        bucket_hash = headers.get("X-RateLimit-Bucket")
+        if bucket_hash is None:
+            return
+
+        try:
+            limit = int(headers["X-RateLimit-Limit"])
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset_after = float(headers["X-RateLimit-Reset-After"])
+        except (KeyError, ValueError):
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            key = f"{bucket_hash}:{route[1]}"
+
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                # the requests made before the hash was known count too
+                provisional = f"{route[0]}:{route[1]}"
+                bucket = self._buckets.pop(provisional, None) or _Bucket()
+                self._buckets[key] = bucket
+            self._routes[route] = key
+
+            reset_at = now + reset_after
+            if bucket.reset_at > now and reset_at <= bucket.reset_at + 0.5:
+                # same window, requests still in flight are already counted locally
+                remaining = min(remaining, bucket.remaining)
+
+            bucket.limit = limit
+            bucket.remaining = remaining
+            bucket.reset_at = reset_at
+            bucket.period = max(reset_after, bucket.period)
+
+            if len(self._buckets) > self._prune_at:
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        # every interaction token has its own webhook buckets
+        expired = {k for k, v in self._buckets.items() if v.reset_at <= now}
+        for key in expired:
+            del self._buckets[key]
+
+        self._routes = {k: v for k, v in self._routes.items() if v not in expired}
+        self._prune_at = max(1024, 2 * len(self._buckets))
+
+    def on_rate_limited(
+        self, route: BucketRoute, headers: Mapping[str, str], body: Any
+    ) -> float:
+        """Record a 429 of the route.
+
+        Returns:
+            float: Seconds to wait before retrying, with jitter.
+        """
+        self.rate_limited += 1
+
+        retry_after = None
+        if isinstance(body, dict):
+            retry_after = body.get("retry_after")
+        if retry_after is None:
+            retry_after = headers.get("Retry-After") or headers.get(
+                "X-RateLimit-Reset-After", 1
+            )
+        retry_after = float(retry_after)
+
+        is_global = headers.get("X-RateLimit-Global", "").lower() == "true" or (
+            isinstance(body, dict) and body.get("global") is True
+        )
+
+        self.update(route, headers)
+        with self._lock:
+            now = time.monotonic()
+            if is_global:
+                self._global_reset_at = max(self._global_reset_at, now + retry_after)
+            else:
+                bucket = self._buckets.setdefault(self._bucket_key(route), _Bucket())
+                bucket.remaining = 0
+                bucket.reset_at = max(bucket.reset_at, now + retry_after)
+
+        # spread the retries of the requests limited together
+        return retry_after + random.uniform(0, min(1.0, retry_after / 10))
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before the retry of a 5xx, half of it jittered.
+
+        Args:
+            attempt (int): Number of retries so far.
+
+        Returns:
+            float
+        """
+        delay = min(self.backoff_max, self.backoff_base * 2**attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Waits for a bucket or the global limit, 429s received and retries."""
+
+        return {
+            "waits": self.waits,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "buckets": len(self._buckets),
+        }
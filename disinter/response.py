@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
+from disinter.codec import JSONCodec, default_codec
+from disinter.command import ApplicationCommandOptionChoice
 from disinter.components import Components, Embed
+from disinter.serializer import BaseJSON
 
 
 class InteractionCallback:
@@ -15,7 +18,15 @@ class InteractionCallback:
     Modal = 9
 
 
-class ModalResponseData:
+class MessageFlags:
+    SuppressEmbeds = 1 << 2
+    Ephemeral = 1 << 6
+
+
+class ModalResponseData(BaseJSON):
+    __slots__ = ("custom_id", "title", "components")
+    _json_lists = ("components",)
+
     def __init__(
         self, custom_id: str, title: str, components: List[Components]
     ) -> None:
@@ -23,15 +34,11 @@ class ModalResponseData:
         self.title = title
         self.components = components
 
-    def _to_json(self):
-        return {
-            "custom_id": self.custom_id,
-            "title": self.title,
-            "components": [i._to_json() for i in self.components],
-        }
 
+class ResponseData(BaseJSON):
+    __slots__ = ("tts", "content", "embeds", "allowed_mentions", "flags", "components")
+    _json_lists = ("embeds", "components")
 
-class ResponseData:
     def __init__(
         self,
         tts: bool | None = None,
@@ -50,41 +57,178 @@ class ResponseData:
         self.components = components
         # self.attachments = attachments // TODO:: implement adding attachment
 
-    def _to_json(self):
-        json: Dict[str, Any] = {}
-
-        if self.tts is not None:
-            json["tts"] = self.tts
-
-        if self.content is not None:
-            json["content"] = self.content
 
-        if self.embeds is not None:
-            json["embeds"] = [i._to_json() for i in self.embeds]
+class AutocompleteResponseData(BaseJSON):
+    __slots__ = ("choices",)
+    _json_lists = ("choices",)
 
-        if self.allowed_mentions is not None:
-            json["allowed_mentions"] = self.allowed_mentions
+    def __init__(self, choices: List[ApplicationCommandOptionChoice]) -> None:
+        self.choices = choices
 
-        if self.flags is not None:
-            json["flags"] = self.flags
 
-        if self.components is not None:
-            json["components"] = [i._to_json() for i in self.components]
+class DiscordResponse(BaseJSON):
+    __slots__ = ("type", "data")
+    _json_nested = ("data",)
 
-        return json
-
-
-class DiscordResponse:
     def __init__(
-        self, type: int, data: ResponseData | ModalResponseData | None = None
+        self,
+        type: int,
+        data: ResponseData | ModalResponseData | AutocompleteResponseData | None = None,
     ) -> None:
         self.type = type
         self.data = data
 
-    def _to_json(self):
-        json: Dict[str, Any] = {"type": self.type}
+    def freeze(self, codec: JSONCodec | None = None) -> ResponseTemplate:
+        """Freeze the response into an immutable template, encoded only once.
+
+        Args:
+            codec (JSONCodec | None, optional): Codec used to encode the response. Defaults to None, the fastest installed codec.
+
+        Returns:
+            ResponseTemplate
+        """
+        return ResponseTemplate(self._to_json(), codec)
+
+
+# stands in for the content of a template, to split the encoded response around it
+_CONTENT_PLACEHOLDER = "\x00disinter:content\x00"
+
+
+class ResponseTemplate:
+    __slots__ = ("type", "encoded", "_json", "_codec", "_content_parts", "_variants")
+
+    def __init__(self, json: Dict[str, Any], codec: JSONCodec | None = None) -> None:
+        """Immutable response, returned by handlers instead of a `DiscordResponse`.
+        It is encoded once, its bytes are sent as is for every interaction.
+        Use `DiscordResponse.freeze` to create one.
+
+        Args:
+            json (Dict[str, Any]): The JSON of the response.
+            codec (JSONCodec | None, optional): Codec used to encode the response. Defaults to None, the fastest installed codec.
+        """
+        codec = codec or default_codec
+
+        object.__setattr__(self, "type", json["type"])
+        object.__setattr__(self, "encoded", codec.dumps(json))
+        object.__setattr__(self, "_json", json)
+        object.__setattr__(self, "_codec", codec)
+        object.__setattr__(self, "_content_parts", None)
+        object.__setattr__(self, "_variants", {})
 
-        if self.data:
-            json["data"] = self.data._to_json()
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
 
-        return json
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self) -> str:
+        return f"<ResponseTemplate type={self.type} {self.encoded!r}>"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # codecs are not picklable, e.g. to return a template from the process pool
+        return (_create_template, (self._json, self.encoded))
+
+    def _to_json(self) -> Dict[str, Any]:
+        return self._json
+
+    def _message_data(self) -> Dict[str, Any]:
+        if self.type not in (
+            InteractionCallback.ChannelMessageWithSource,
+            InteractionCallback.UpdateMessage,
+        ):
+            raise ValueError("Only message responses have content and flags")
+
+        return self._json.get("data") or {}
+
+    def with_content(self, content: str) -> ResponseTemplate:
+        """Get a variant of the template with a different content.
+        Only the content is encoded, the rest of the response is reused as is.
+
+        Args:
+            content (str): Content of the variant.
+
+        Raises:
+            ValueError: If the template is not a message response.
+
+        Returns:
+            ResponseTemplate
+        """
+        data = self._message_data()
+
+        parts: Tuple[bytes, bytes] | None = self._content_parts
+        if parts is None:
+            # split the response once around the content, the content goes first so
+            # that the position does not depend on whether the template has one
+            json = {
+                **self._json,
+                "data": {
+                    "content": _CONTENT_PLACEHOLDER,
+                    **{k: v for k, v in data.items() if k != "content"},
+                },
+            }
+            prefix, suffix = self._codec.dumps(json).split(
+                self._codec.dumps(_CONTENT_PLACEHOLDER)
+            )
+
+            parts = (prefix, suffix)
+            object.__setattr__(self, "_content_parts", parts)
+
+        return _create_template(
+            {**self._json, "data": {**data, "content": content}},
+            parts[0] + self._codec.dumps(content) + parts[1],
+            self._codec,
+            parts,
+        )
+
+    def with_ephemeral(self, ephemeral: bool = True) -> ResponseTemplate:
+        """Get a variant of the template with the `EPHEMERAL` flag set or unset.
+        Variants are cached, toggle the flag before substituting the content.
+
+        Args:
+            ephemeral (bool, optional): Set the flag. Defaults to True.
+
+        Raises:
+            ValueError: If the template is not a message response.
+
+        Returns:
+            ResponseTemplate
+        """
+        data = self._message_data()
+
+        flags = data.get("flags") or 0
+        if ephemeral:
+            flags |= MessageFlags.Ephemeral
+        else:
+            flags &= ~MessageFlags.Ephemeral
+
+        if flags == (data.get("flags") or 0):
+            return self
+
+        template = self._variants.get(flags)
+        if template is None:
+            data = {k: v for k, v in data.items() if k != "flags"}
+            if flags:
+                data["flags"] = flags
+
+            template = ResponseTemplate({**self._json, "data": data}, self._codec)
+            self._variants[flags] = template
+
+        return template
+
+
+def _create_template(
+    json: Dict[str, Any],
+    encoded: bytes,
+    codec: JSONCodec | None = None,
+    content_parts: Tuple[bytes, bytes] | None = None,
+) -> ResponseTemplate:
+    # build a template from its already encoded JSON
+    template = object.__new__(ResponseTemplate)
+    object.__setattr__(template, "type", json["type"])
+    object.__setattr__(template, "encoded", encoded)
+    object.__setattr__(template, "_json", json)
+    object.__setattr__(template, "_codec", codec or default_codec)
+    object.__setattr__(template, "_content_parts", content_parts)
+    object.__setattr__(template, "_variants", {})
+
+    return template
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+def compile_serializer(
+    cls: type,
+    fields: Sequence[str],
+    nested: Sequence[str] = (),
+    lists: Sequence[str] = (),
+) -> Callable[[Any], Dict[str, Any]]:
+    """Generate a `_to_json` function specialized to the fields of a class.
+    Fields set to None are omitted like the generic `vars()` based serializer.
+
+    Args:
+        cls (type): Class to generate the serializer for.
+        fields (Sequence[str]): Attribute names, in output order.
+        nested (Sequence[str], optional): Fields holding an object with its own `_to_json`. Defaults to ().
+        lists (Sequence[str], optional): Fields holding a list of objects with their own `_to_json`. Defaults to ().
+
+    Returns:
+        Callable[[Any], Dict[str, Any]]
+    """
+    lines = ["def _to_json(self):", "    json = {}"]
+    for name in fields:
+        if not name.isidentifier():
+            raise ValueError(f"{cls.__name__}: invalid field name {name!r}")
+
+        lines.append(f"    value = self.{name}")
+        lines.append("    if value is not None:")
+        if name in nested:
+            lines.append(f"        json[{name!r}] = value._to_json()")
+        elif name in lists:
+            lines.append(f"        json[{name!r}] = [i._to_json() for i in value]")
+        else:
+            lines.append(f"        json[{name!r}] = value")
+    lines.append("    return json")
+
+    namespace: Dict[str, Any] = {}
+    exec(
+        compile("\n".join(lines), f"<{cls.__qualname__} serializer>", "exec"),
+        namespace,
+    )
+
+    func = namespace["_to_json"]
+    func.__qualname__ = f"{cls.__qualname__}._to_json"
+    return func
+
+
+def slot_fields(cls: type) -> List[str]:
+    """Get the `__slots__` attributes of a class and its bases, base classes first."""
+
+    fields: List[str] = []
+    for klass in reversed(cls.__mro__[:-1]):
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+
+        fields.extend(
+            i for i in slots if i not in fields and i not in ("__dict__", "__weakref__")
+        )
+
+    return fields
+
+
+class BaseJSON:
+    __slots__ = ()
+
+    # fields serialized with their own `_to_json`, a single object or a list of objects
+    _json_nested: Tuple[str, ...] = ()
+    _json_lists: Tuple[str, ...] = ()
+
+    # slots read by the `vars()` based serializer of classes with a `__dict__`
+    _json_slots: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+
+        # every class gets its own serializer unless it defines one itself
+        if "_to_json" in cls.__dict__:
+            return
+
+        if all("__slots__" in i.__dict__ for i in cls.__mro__[:-1]):
+            # the fields of slotted classes are known upfront
+            cls._to_json = compile_serializer(  # type: ignore
+                cls, slot_fields(cls), cls._json_nested, cls._json_lists
+            )
+        else:
+            # each instance of a class with a `__dict__` can set other attributes
+            cls._json_slots = tuple(slot_fields(cls))
+            cls._to_json = BaseJSON._to_json  # type: ignore
+
+    def _to_json(self) -> Dict[str, Any]:
+        cls = type(self)
+        nested, lists = cls._json_nested, cls._json_lists
+
+        items = [(i, getattr(self, i, None)) for i in cls._json_slots]
+        items.extend(vars(self).items())
+
+        json: Dict[str, Any] = {}
+        for key, value in items:
+            if value is None:
+                continue
+
+            if key in nested:
+                value = value._to_json()
+            elif key in lists:
+                value = [i._to_json() for i in value]
+            json[key] = value
+
+        return json
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class _Counters:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.coalesced = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Calls made, and calls that waited for an identical one in flight instead."""
+
+        return {"calls": self.calls, "coalesced": self.coalesced}
+
+
+class SingleFlight(_Counters):
+    def __init__(self) -> None:
+        """Coalesces identical calls made at the same time from several threads:
+        the first one runs, the others wait for it and share its result or error."""
+
+        super().__init__()
+
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Call `func`, unless a call with the same key is in flight.
+
+        Args:
+            key (Hashable): Identifies identical calls.
+            func (Callable[[], T]): The call.
+
+        Returns:
+            T: Result of the call that ran.
+        """
+        with self._lock:
+            waiting = self._calls.get(key)
+            if waiting is None:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+
+        if waiting is not None:
+            waiting.done.wait()
+            if waiting.error is not None:
+                raise waiting.error
+            return waiting.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+
+class AsyncSingleFlight(_Counters):
+    def __init__(self) -> None:
+        """Coalesces identical calls made at the same time on the event loop:
+        the first one runs as a task, the others await it and share its result or error.
+        Cancelling a caller does not cancel the shared call."""
+
+        super().__init__()
+
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+
+    def _done(self, key: Hashable, task: asyncio.Future) -> None:
+        del self._tasks[key]
+        if not task.cancelled():
+            # retrieved, even if every caller was cancelled
+            task.exception()
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Await `func()`, unless a call with the same key is in flight.
+
+        Args:
+            key (Hashable): Identifies identical calls.
+            func (Callable[[], Awaitable[T]]): The call.
+
+        Returns:
+            T: Result of the call that ran.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda t: self._done(key, t))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
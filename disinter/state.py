@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import binascii
+import hashlib
+import hmac
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+
+from disinter.dispatch import is_pattern
+
+# longest custom_id Discord accepts
+MAX_CUSTOM_ID_LENGTH = 100
+
+# url-safe base64 with the C codec of `binascii`
+_TO_URLSAFE = bytes.maketrans(b"+/", b"-_")
+_FROM_URLSAFE = bytes.maketrans(b"-_", b"+/")
+
+
+class StateError(ValueError):
+    """Raised when a custom_id does not hold a valid, untampered state."""
+
+
+class StateField(ABC):
+    # number of distinct values, the field is packed as a digit of this base
+    radix: int = 1
+
+    @abstractmethod
+    def pack(self, value: Any) -> int:
+        """Get the digit of a value, `ValueError` if it is out of the field's range."""
+
+    @abstractmethod
+    def unpack(self, digit: int) -> Any:
+        """Get the value of a digit made by `pack`."""
+
+
+class IntField(StateField):
+    def __init__(self, max_value: int, min_value: int = 0) -> None:
+        """Integer between `min_value` and `max_value`, inclusive.
+        The smaller the range, the shorter the custom_id.
+
+        Args:
+            max_value (int): Largest value.
+            min_value (int, optional): Smallest value. Defaults to 0.
+        """
+        if max_value < min_value:
+            raise ValueError("`max_value` must not be less than `min_value`")
+
+        self.min_value = min_value
+        self.max_value = max_value
+        self.radix = max_value - min_value + 1
+
+    def pack(self, value: int) -> int:
+        if not self.min_value <= value <= self.max_value:
+            raise ValueError(
+                f"{value!r} is not between {self.min_value} and {self.max_value}"
+            )
+
+        return value - self.min_value
+
+    def unpack(self, digit: int) -> int:
+        return digit + self.min_value
+
+
+class SnowflakeField(StateField):
+    """Discord id, read back as a string."""
+
+    radix = 1 << 64
+
+    def pack(self, value: str | int) -> int:
+        value = int(value)
+        if not 0 <= value < self.radix:
+            raise ValueError(f"{value!r} is not a snowflake")
+
+        return value
+
+    def unpack(self, digit: int) -> str:
+        return str(digit)
+
+
+class EnumField(StateField):
+    def __init__(self, values: Iterable[Hashable]) -> None:
+        """One of a few values, like a sort order or an action.
+        Values are packed as their index, append new ones at the end.
+
+        Args:
+            values (Iterable[Hashable]): The values, or an `enum.Enum` class.
+        """
+        self.values: Tuple[Hashable, ...] = tuple(values)
+        if not self.values:
+            raise ValueError("`values` must not be empty")
+
+        self.radix = len(self.values)
+        self._indexes = {v: i for i, v in enumerate(self.values)}
+
+    def pack(self, value: Hashable) -> int:
+        index = self._indexes.get(value)
+        if index is None:
+            raise ValueError(f"{value!r} is not one of {list(self.values)}")
+
+        return index
+
+    def unpack(self, digit: int) -> Hashable:
+        return self.values[digit]
+
+
+class BoolField(StateField):
+    radix = 2
+
+    def pack(self, value: bool) -> int:
+        return 1 if value else 0
+
+    def unpack(self, digit: int) -> bool:
+        return digit == 1
+
+
+class StateCodec:
+    def __init__(
+        self,
+        prefix: str,
+        fields: Dict[str, StateField],
+        secret: bytes | str | None = None,
+        mac_size: int = 6,
+    ) -> None:
+        """Packs small typed state into a custom_id, so that any worker can
+        serve a click without a shared store.
+
+        The fields are packed into a single integer, each one taking exactly
+        the room of its number of values, encoded as url-safe base64 after
+        the prefix: `prefix:payload`. With a secret, a truncated HMAC-SHA256
+        of the custom_id is appended and checked when decoding.
+
+        Args:
+            prefix (str): Identifies the codec, and routes its components.
+            fields (Dict[str, StateField]): Fields of the state, by name.
+            secret (bytes | str | None, optional): Key of the HMAC. If None, the state is not signed. Defaults to None.
+            mac_size (int, optional): Bytes of the HMAC kept. Defaults to 6.
+
+        Raises:
+            ValueError: If the prefix is a pattern or the longest custom_id exceeds 100 characters.
+        """
+        if is_pattern(prefix):
+            raise ValueError(f"Prefix {prefix!r} must not have `{{}}` parameters")
+
+        if isinstance(secret, str):
+            secret = secret.encode()
+
+        self.prefix = prefix
+        self.fields = fields
+        self.secret = secret
+        self.mac_size = mac_size if secret is not None else 0
+
+        # the last field is the most significant digit
+        self._fields: List[Tuple[str, StateField]] = list(fields.items())
+
+        capacity = 1
+        for _, field in self._fields:
+            capacity *= field.radix
+
+        self._capacity = capacity
+        self._size = max((capacity - 1).bit_length() + 7, 8) // 8
+        self._head = f"{prefix}:"
+
+        # keyed once, every signature continues from a copy
+        self._hmac = None
+        if secret is not None:
+            self._hmac = hmac.new(secret, prefix.encode(), hashlib.sha256)
+
+        length = len(self._head) + -(-4 * (self._size + self.mac_size) // 3)
+        if length > MAX_CUSTOM_ID_LENGTH:
+            raise ValueError(
+                f"custom_ids of {prefix!r} take up to {length} characters, "
+                f"more than {MAX_CUSTOM_ID_LENGTH}"
+            )
+
+        self.max_length = length
+
+    @property
+    def pattern(self) -> str:
+        """custom_id pattern matching the states of this codec."""
+
+        return f"{self.prefix}:{{state}}"
+
+    def _mac(self, packed: bytes) -> bytes:
+        mac = self._hmac.copy()  # type: ignore
+        mac.update(packed)
+        return mac.digest()[: self.mac_size]
+
+    def encode(self, **values: Any) -> str:
+        """Pack the values of every field into a custom_id.
+
+        Raises:
+            ValueError: If a field is missing or its value is invalid.
+
+        Returns:
+            str
+        """
+        number = 0
+        for name, field in reversed(self._fields):
+            try:
+                value = values[name]
+            except KeyError:
+                raise ValueError(f"Missing state field {name!r}") from None
+
+            number = number * field.radix + field.pack(value)
+
+        packed = number.to_bytes(self._size, "big")
+        if self.mac_size:
+            packed += self._mac(packed)
+
+        payload = binascii.b2a_base64(packed, newline=False).translate(_TO_URLSAFE)
+        return self._head + payload.rstrip(b"=").decode()
+
+    def decode(self, custom_id: str) -> Dict[str, Any]:
+        """Unpack the values of a custom_id made by `encode`.
+
+        Raises:
+            StateError: If the custom_id is not from this codec, is malformed or its HMAC does not match.
+
+        Returns:
+            Dict[str, Any]: Values by field name.
+        """
+        if not custom_id.startswith(self._head):
+            raise StateError(f"{custom_id!r} is not a {self.prefix!r} state")
+
+        payload = custom_id[len(self._head) :]
+        try:
+            # the padding is stripped, extra `=` are ignored
+            packed = binascii.a2b_base64(
+                payload.encode().translate(_FROM_URLSAFE) + b"=="
+            )
+        except (binascii.Error, ValueError):
+            raise StateError(f"Malformed state {custom_id!r}") from None
+
+        if len(packed) != self._size + self.mac_size:
+            raise StateError(f"Malformed state {custom_id!r}")
+
+        if self.mac_size:
+            packed, mac = packed[: self._size], packed[self._size :]
+            if not hmac.compare_digest(mac, self._mac(packed)):
+                raise StateError(f"Invalid signature of state {custom_id!r}")
+
+        number = int.from_bytes(packed, "big")
+        if number >= self._capacity:
+            raise StateError(f"Malformed state {custom_id!r}")
+
+        state: Dict[str, Any] = {}
+        for name, field in self._fields:
+            number, digit = divmod(number, field.radix)
+            state[name] = field.unpack(digit)
+
+        return state
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # contexts are pickled to the process pool, HMAC objects are not picklable
+        return (StateCodec, (self.prefix, self.fields, self.secret, self.mac_size))
+
+    def __repr__(self) -> str:
+        return f"<StateCodec {self.prefix!r} {list(self.fields)}>"
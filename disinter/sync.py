@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict, List
+
+# fields the API adds to the commands it returns, only compared if set locally
+SERVER_FIELDS = (
+    "id",
+    "application_id",
+    "guild_id",
+    "version",
+    "default_permission",
+    "integration_types",
+    "contexts",
+)
+
+# values the API fills in for the fields left out of a registered command
+REMOTE_DEFAULTS: Dict[str, Any] = {
+    "dm_permission": True,
+}
+
+_MISSING: Any = object()
+
+
+def canonical_json(commands: List[Dict[str, Any]]) -> bytes:
+    """Serialize commands the same way whatever their order and the order of their keys.
+
+    Args:
+        commands (List[Dict[str, Any]]): Commands from `DisInter._parse_commands`.
+
+    Returns:
+        bytes
+    """
+    ordered = sorted(commands, key=lambda i: (i.get("type", 1), i["name"]))
+    return json.dumps(
+        ordered, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode()
+
+
+def command_hash(commands: List[Dict[str, Any]]) -> str:
+    """SHA-256 of the canonical JSON of the commands."""
+
+    return hashlib.sha256(canonical_json(commands)).hexdigest()
+
+
+def _matches(local: Any, remote: Any) -> bool:
+    if isinstance(local, dict):
+        if not isinstance(remote, dict):
+            return False
+
+        for key, value in local.items():
+            if key not in remote or not _matches(value, remote[key]):
+                return False
+
+        for key, value in remote.items():
+            if key in local or key in SERVER_FIELDS:
+                continue
+
+            # left out locally, equal to what the API fills in
+            if value and REMOTE_DEFAULTS.get(key, _MISSING) != value:
+                return False
+
+        return True
+
+    if isinstance(local, list):
+        return (
+            isinstance(remote, list)
+            and len(local) == len(remote)
+            and all(_matches(i, k) for i, k in zip(local, remote))
+        )
+
+    return local == remote
+
+
+def commands_match(local: List[Dict[str, Any]], remote: List[Dict[str, Any]]) -> bool:
+    """Check if the registered commands are the same as the local ones.
+    Fields the API adds or fills with their default are ignored.
+
+    Args:
+        local (List[Dict[str, Any]]): Commands from `DisInter._parse_commands`.
+        remote (List[Dict[str, Any]]): Commands returned by `get_application_commands`.
+
+    Returns:
+        bool
+    """
+    if len(local) != len(remote):
+        return False
+
+    registered = {(i.get("type", 1), i["name"]): i for i in remote}
+    for command in local:
+        other = registered.get((command.get("type", 1), command["name"]))
+        if other is None or not _matches(command, other):
+            return False
+
+    return True
+
+
+def plan_sync(
+    guild: str | None,
+    commands: List[Dict[str, Any]],
+    digest: str,
+    stored: str | None,
+    registered: List[Dict[str, Any]] | None,
+) -> SyncPlan:
+    """Plan the sync of a registration.
+
+    Args:
+        guild (str | None): The guild, None for the global commands.
+        commands (List[Dict[str, Any]]): Commands from `DisInter._parse_commands`.
+        digest (str): Their `command_hash`.
+        stored (str | None): Hash persisted by the last sync of the registration.
+        registered (List[Dict[str, Any]] | None): The registered commands, None if they were not fetched.
+
+    Returns:
+        SyncPlan
+    """
+    if stored == digest:
+        action, reason = SyncPlan.Unchanged, "same hash as the hash file"
+    elif registered is None:
+        action, reason = SyncPlan.Overwrite, "new hash"
+    elif commands_match(commands, registered):
+        action, reason = SyncPlan.Unchanged, "same as the registered commands"
+    else:
+        action, reason = SyncPlan.Overwrite, "registered commands differ"
+
+    return SyncPlan(guild, action, reason, len(commands), digest)
+
+
+def load_hashes(path: str) -> Dict[str, str]:
+    """Read the command hashes persisted by a previous sync, empty if there are none."""
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            hashes = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    return hashes if isinstance(hashes, dict) else {}
+
+
+def save_hashes(path: str, hashes: Dict[str, str]) -> None:
+    """Persist the command hashes, replacing the file atomically."""
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".disinter-sync-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(hashes, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class SyncPlan:
+    # actions of a plan
+    Unchanged = "unchanged"
+    Overwrite = "overwrite"
+    Failed = "failed"
+
+    def __init__(
+        self,
+        guild: str | None,
+        action: str,
+        reason: str,
+        commands: int,
+        hash: str,
+        error: Exception | None = None,
+    ) -> None:
+        """What a command sync does, or did, for the global commands or a guild.
+
+        Args:
+            guild (str | None): The guild, None for the global commands.
+            action (str): `unchanged`, `overwrite` with a single bulk PUT, or `failed`.
+            reason (str): Why.
+            commands (int): Number of local commands.
+            hash (str): Hash of the local commands.
+            error (Exception | None, optional): Why the sync of the registration failed. Defaults to None.
+        """
+        self.guild = guild
+        self.action = action
+        self.reason = reason
+        self.commands = commands
+        self.hash = hash
+        self.error = error
+
+    @classmethod
+    def failed(
+        cls, guild: str | None, commands: int, hash: str, error: Exception
+    ) -> SyncPlan:
+        return cls(
+            guild,
+            cls.Failed,
+            f"{type(error).__name__}: {error}",
+            commands,
+            hash,
+            error,
+        )
+
+    def __str__(self) -> str:
+        scope = "global" if self.guild is None else f"guild {self.guild}"
+        return (
+            f"{scope}: {self.action} {self.commands} commands "
+            f"({self.reason}, hash {self.hash[:12]})"
+        )
+
+    def __repr__(self) -> str:
+        return f"<SyncPlan {self}>"
+
+
+# called with a plan once done, the number of plans done and the total
+SyncProgress = Callable[[SyncPlan, int, int], None]
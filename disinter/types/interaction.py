@@ -36,7 +36,7 @@ class Member(BaseObject):
     roles: List[str]
     joined_at: str
     premium_since: str | None
-    deaf: str
+    deaf: bool
     mute: bool
     pending: bool | None
     permissions: str
@@ -265,7 +265,7 @@ class ComponentSelectMenu(BaseObject):
     channel_types: List[int]
     placeholder: str
     min_values: int
-    max_valueS: int
+    max_values: int
     disabled: bool
 
 
@@ -302,7 +302,7 @@ class Message(BaseObject):
     tts: bool
     mention_everyone: bool
     mentions: List[User]
-    mention_roles: List[Role]
+    mention_roles: List[SnowFlake]
     mention_channels: List[ChannelMention]
     attachments: List[Attachment]
     embeds: List[Embed]
@@ -336,7 +336,7 @@ class InteractionDataResolved(BaseObject):
 class InteractionDataOption(BaseObject):
     name: str
     type: int
-    value: str | int | float
+    value: str | int | float | bool
     options: List[Self]  # type: ignore
     focused: bool
 
@@ -375,7 +375,7 @@ class Interaction(BaseObject):
     token: str
     version: int
     message: Message
-    app_permisions: str
+    app_permissions: str
     locale: str
     guild_locale: str
 
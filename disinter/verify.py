@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from typing import Callable, Dict
+
+
+class SignatureVerifier:
+    def __init__(self, public_key: str, backend: str | None = None) -> None:
+        """Ed25519 verifier of the interaction request signatures.
+        The public key is parsed once and reused for every request.
+
+        Args:
+            public_key (str): Discord app Public Key in hex.
+            backend (str | None, optional): Crypto backend, `nacl` (PyNaCl) or `cryptography`.
+                If None, PyNaCl is used when installed, otherwise cryptography. Defaults to None.
+
+        Raises:
+            ValueError: If the backend is unknown.
+            ImportError: If the backend is not installed.
+        """
+        if backend is not None and backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown verify backend {backend!r}, expected one of {list(BACKENDS)}"
+            )
+
+        key = bytes.fromhex(public_key)
+
+        if backend is not None:
+            self._verify = BACKENDS[backend](key)
+            self.backend = backend
+            return
+
+        for name, factory in BACKENDS.items():
+            try:
+                self._verify = factory(key)
+                self.backend = name
+                return
+            except ImportError:
+                continue
+
+        raise ImportError("Ed25519 verification requires `PyNaCl` or `cryptography`")
+
+    def verify(self, body: bytes, signature: str, timestamp: str) -> bool:
+        """Verify the signature of an interaction request.
+
+        Args:
+            body (bytes): Raw request body.
+            signature (str): `X-Signature-Ed25519` header.
+            timestamp (str): `X-Signature-Timestamp` header.
+
+        Returns:
+            bool: True if the signature is valid.
+        """
+        try:
+            return self._verify(timestamp.encode() + body, bytes.fromhex(signature))
+        except ValueError:
+            # malformed signature hex
+            return False
+
+
+def _nacl_backend(key: bytes) -> Callable[[bytes, bytes], bool]:
+    from nacl.exceptions import BadSignatureError
+    from nacl.signing import VerifyKey
+
+    verify_key = VerifyKey(key)
+
+    def verify(message: bytes, signature: bytes) -> bool:
+        try:
+            verify_key.verify(message, signature)
+        except BadSignatureError:
+            return False
+
+        return True
+
+    return verify
+
+
+def _cryptography_backend(key: bytes) -> Callable[[bytes, bytes], bool]:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+
+    verify_key = Ed25519PublicKey.from_public_bytes(key)
+
+    def verify(message: bytes, signature: bytes) -> bool:
+        try:
+            verify_key.verify(signature, message)
+        except InvalidSignature:
+            return False
+
+        return True
+
+    return verify
+
+
+BACKENDS: Dict[str, Callable[[bytes], Callable[[bytes, bytes], bool]]] = {
+    "nacl": _nacl_backend,
+    "cryptography": _cryptography_backend,
+}
@@ -3,6 +3,7 @@ import os
 from disinter import DisInter
 from disinter.components import ButtonStyles, ComponentActionRows, ComponentButton
 from disinter.context import ComponentContext, SlashContext
+from disinter.response import DiscordResponse, InteractionCallback, ResponseData
 
 TOKEN = os.environ.get("TOKEN", "")
 APPLICATION_ID = os.environ.get("APPLICATION_ID", "")
@@ -23,9 +24,16 @@ def start():
         print(e)
 
 
+# the reply never changes, it is encoded only once
+CLICKED = DiscordResponse(
+    type=InteractionCallback.ChannelMessageWithSource,
+    data=ResponseData(content="You have clicked the **`Click Me`** button"),
+).freeze()
+
+
 @bot.button_component("sample-click")
 def click_me(ctx: ComponentContext):
-    return ctx.reply("You have clicked the **`Click Me`** button")
+    return CLICKED
 
 
 @bot.slash_command(name="button", description="Show a button component")
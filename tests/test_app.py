@@ -0,0 +1,95 @@
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from nacl.signing import SigningKey
+
+from disinter import DisInter
+
+KEY = SigningKey.generate()
+
+
+def make_app(**kwargs) -> DisInter:
+    return DisInter(
+        token="token",
+        application_id="1",
+        public_key=KEY.verify_key.encode().hex(),
+        **kwargs,
+    )
+
+
+def post(client: TestClient, interaction: dict):
+    body = json.dumps(interaction).encode()
+    timestamp = str(int(time.time()))
+    signature = KEY.sign(timestamp.encode() + body).signature.hex()
+
+    return client.post(
+        "/",
+        content=body,
+        headers={
+            "X-Signature-Ed25519": signature,
+            "X-Signature-Timestamp": timestamp,
+        },
+    )
+
+
+def command(name: str, id: str) -> dict:
+    return {
+        "id": id,
+        "type": 2,
+        "token": "token",
+        "application_id": "1",
+        "data": {"name": name, "type": 1},
+    }
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{}, {"verify_workers": 2}, {"verify_workers": 2, "lean": True}]
+)
+def test_sync_handler_after_restart(kwargs):
+    app = make_app(**kwargs)
+
+    @app.slash_command(name="ping", description="ping")
+    def ping(ctx):
+        return ctx.reply("pong")
+
+    for i in range(3):
+        with TestClient(app) as client:
+            response = post(client, command("ping", str(i)))
+
+        assert response.status_code == 200
+        assert response.json() == {"type": 4, "data": {"content": "pong"}}
+        # the pools are shut down with the app
+        assert app._sync_executor is None
+        assert app._verify_executor is None
+
+
+def test_deferred_ephemeral_reply():
+    app = make_app(defer_after=0.05)
+    edits = []
+    app.api.edit_original_interaction_response = lambda token, data: edits.append(
+        (token, data)
+    )
+
+    @app.slash_command(name="slow", description="slow", defer_ephemeral=True)
+    def slow(ctx):
+        time.sleep(0.2)
+        return ctx.reply("secret", ephemeral=True)
+
+    with TestClient(app) as client:
+        response = post(client, command("slow", "1"))
+        time.sleep(0.4)
+
+    assert response.json() == {"type": 5, "data": {"flags": 64}}
+    assert edits == [("token", {"content": "secret", "flags": 64})]
+
+
+def test_process_handler_must_be_module_level():
+    app = make_app()
+
+    with pytest.raises(ValueError, match="module level"):
+
+        @app.slash_command(name="local", description="local", executor="process")
+        def local(ctx):
+            return ctx.reply("local")
@@ -0,0 +1,43 @@
+from disinter.dispatch import PatternTrie
+
+
+def trie(*patterns: str) -> PatternTrie:
+    patterns_trie = PatternTrie()
+    for i in patterns:
+        patterns_trie.add(i, i)
+
+    return patterns_trie
+
+
+def test_parameter_ends_at_first_match():
+    assert trie("vote:{poll}:{choice}").match("vote:1:2:3") == (
+        "vote:{poll}:{choice}",
+        {"poll": "1", "choice": "2:3"},
+    )
+
+
+def test_overlapping_literal_suffixes():
+    patterns = trie("p:{a}_y", "p:{a}-x")
+
+    assert patterns.match("p:1-2_y") == ("p:{a}_y", {"a": "1-2"})
+    assert patterns.match("p:1_y-x") == ("p:{a}-x", {"a": "1_y"})
+    assert patterns.match("p:1-x") == ("p:{a}-x", {"a": "1"})
+    assert patterns.match("p:1-2") is None
+
+
+def test_shorter_pattern_after_failed_parameter():
+    patterns = trie("vote:{poll}:{choice}", "vote:{poll}")
+
+    assert patterns.match("vote:1:") == ("vote:{poll}", {"poll": "1:"})
+    assert patterns.match("vote:1:2") == (
+        "vote:{poll}:{choice}",
+        {"poll": "1", "choice": "2"},
+    )
+    assert patterns.match("vote:1") == ("vote:{poll}", {"poll": "1"})
+
+
+def test_literals_before_parameters():
+    patterns = trie("page:{n}", "page:last")
+
+    assert patterns.match("page:last") == ("page:last", {})
+    assert patterns.match("page:lastx") == ("page:{n}", {"n": "lastx"})
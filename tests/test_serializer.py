@@ -0,0 +1,42 @@
+from disinter.components import ComponentButton, Emoji
+
+
+class MyButton(ComponentButton):
+    # no __slots__, instances have a __dict__
+    def __init__(self, style: int, label: str = None, extra: str = None) -> None:
+        super().__init__(style, label, emoji=Emoji(name="x"))
+        if extra is not None:
+            self.extra = extra
+
+
+def test_slotted_class():
+    assert ComponentButton(1, "a", custom_id="c")._to_json() == {
+        "type": 2,
+        "style": 1,
+        "label": "a",
+        "custom_id": "c",
+    }
+
+
+def test_attribute_set_by_some_instances():
+    emoji = {"name": "x"}
+
+    assert MyButton(1, "a")._to_json() == {
+        "type": 2,
+        "style": 1,
+        "label": "a",
+        "emoji": emoji,
+    }
+    assert MyButton(1, "b", extra="X")._to_json() == {
+        "type": 2,
+        "style": 1,
+        "label": "b",
+        "emoji": emoji,
+        "extra": "X",
+    }
+    assert MyButton(1, "a")._to_json() == {
+        "type": 2,
+        "style": 1,
+        "label": "a",
+        "emoji": emoji,
+    }